@@ -0,0 +1,191 @@
+# app/cache/__init__.py
+
+"""
+Module: cache
+
+In-process LRU/TTL cache for resolved LLM function calls, with an optional
+shared backend (e.g. Redis) consulted on local misses, and a single-flight
+group that coalesces identical in-flight calls.
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """
+    Interface for a shared cache backend. Implementations must be safe to call
+    from the event loop.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        ...
+
+
+class LocalCacheBackend(CacheBackend):
+    """
+    Dictionary-backed stand-in for a shared backend, used in tests and
+    single-process deployments.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._data: Dict[str, Tuple[float, Any]] = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._data[key] = (self._clock() + ttl, value)
+
+
+class ResultCache:
+    """
+    Size-bounded LRU cache whose entries expire after ttl seconds.
+
+    Parameters:
+    - maxsize (int): Maximum number of local entries; 0 disables caching.
+    - ttl (float): Seconds an entry stays valid.
+    - backend (CacheBackend, optional): Shared backend checked on local misses.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 300.0,
+        backend: Optional[CacheBackend] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend
+        self._clock = clock
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(prompt: str, model: str) -> str:
+        """
+        Build the cache key for a prompt sent to a model.
+        """
+        return f"{model}:{prompt}"
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Return the cached value for key, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > self._clock():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+
+        if self.backend is not None:
+            try:
+                value = await self.backend.get(key)
+            except Exception as e:
+                logger.warning(f"Cache backend get failed: {e}")
+                value = None
+            if value is not None:
+                self._store(key, value)
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        """
+        Cache value under key locally and in the shared backend.
+        """
+        if not self.enabled:
+            return
+        self._store(key, value)
+        if self.backend is not None:
+            try:
+                await self.backend.set(key, value, self.ttl)
+            except Exception as e:
+                logger.warning(f"Cache backend set failed: {e}")
+
+    def clear(self) -> None:
+        """
+        Drop all local entries and reset the counters.
+        """
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, key: str, value: Any) -> None:
+        self._data[key] = (self._clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)  # Evict the least recently used entry
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key starts the call; callers arriving while it is
+    in flight await the same result (or exception). The call runs as its own
+    task, so a cancelled caller does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, "asyncio.Task[Any]"] = {}
+        self.coalesced = 0  # Callers served by another caller's in-flight call
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn() for key unless a call for key is already in flight, and
+        return its result.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: "asyncio.Task[Any]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved in case every caller went away
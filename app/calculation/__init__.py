@@ -1,18 +1,42 @@
 from abc import ABC, abstractmethod, ABCMeta
 from datetime import datetime
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
+import base64
+import json
+import math
 import uuid
 
 from sqlalchemy import (
     Column,
     String,
     DateTime,
+    Float,
     ForeignKey,
+    Index,
+    Integer,
     JSON,
+    and_,
+    bindparam,
+    case,
+    delete,
+    event,
+    func,
+    insert,
+    inspect,
+    literal,
+    or_,
+    select,
+    text,
+    tuple_,
+    update,
 )
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.orm import Session, declarative_base, relationship, selectinload, with_polymorphic
 from sqlalchemy.ext.declarative import DeclarativeMeta
 
+from app.operations import power, power_mod
+
 
 # Define a custom metaclass combining DeclarativeMeta and ABCMeta
 class MyMeta(DeclarativeMeta, ABCMeta):
@@ -55,6 +79,7 @@ class Calculation(Base, ABC):
     user_id = Column(PG_UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)  # Foreign key to User
     type = Column(String(50), nullable=False)  # Type of calculation (e.g., "addition", "subtraction")
     inputs = Column(JSON, nullable=False)  # JSON field to store inputs as a list
+    result = Column(Float, nullable=True)  # Stored get_result(); NULL if not yet computed or not computable
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
@@ -64,35 +89,48 @@ class Calculation(Base, ABC):
     __mapper_args__ = {
         'polymorphic_on': type,
         'polymorphic_identity': 'calculation',
-        'with_polymorphic': '*',
     }
 
+    __table_args__ = (
+        # Serves a user's history newest-first and its keyset pagination
+        Index('ix_calculations_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+    )
+
+    @classmethod
+    def class_for(cls, calculation_type: str) -> type:
+        """
+        Return the subclass stored under a polymorphic identity, e.g.
+        'addition'. Subclasses are found through the mapper, so a new
+        subclass needs no registration anywhere.
+        """
+        mapper = cls.__mapper__.polymorphic_map.get(calculation_type)
+        if mapper is None or mapper.class_ is Calculation:
+            raise ValueError(f"Unsupported calculation type: {calculation_type}")
+        return mapper.class_
+
     @classmethod
     def create(cls, calculation_type: str, user_id: uuid.UUID, inputs: list[float]) -> 'Calculation':
         """
         Factory method to create Calculation instances based on the calculation type.
         """
-        calculation_classes = {
-            'addition': Addition,
-            'subtraction': Subtraction,
-            'multiplication': Multiplication,
-            'division': Division,
-            'power': Power,
-            'modulus': Modulus
-        }
-        calculation_class = calculation_classes.get(calculation_type.lower())
-        if not calculation_class:
-            raise ValueError(f"Unsupported calculation type: {calculation_type}")
+        calculation_class = cls.class_for(calculation_type.lower())
         return calculation_class(user_id=user_id, inputs=inputs)
 
+    @staticmethod
     @abstractmethod
-    def get_result(self) -> float:
+    def compute(inputs: Any) -> float:
         """
-        Abstract method to compute the result of the calculation.
+        Abstract method to compute a result from a list of inputs.
         Must be implemented by all subclasses.
         """
         pass
 
+    def get_result(self) -> float:
+        """
+        Compute the result of the calculation from its inputs.
+        """
+        return self.compute(self.inputs)
+
     def __repr__(self):
         return f"<Calculation(type={self.type}, inputs={self.inputs})>"
 
@@ -103,10 +141,9 @@ class Addition(Calculation):
         'polymorphic_identity': 'addition',
     }
 
-    def get_result(self) -> float:
-        if not isinstance(self.inputs, list):
-            raise ValueError("Inputs must be a list of numbers.")
-        return sum(self.inputs)
+    @staticmethod
+    def compute(inputs: Any) -> float:
+        return compute_addition(inputs)
 
 
 # Subclass for Subtraction
@@ -115,13 +152,9 @@ class Subtraction(Calculation):
         'polymorphic_identity': 'subtraction',
     }
 
-    def get_result(self) -> float:
-        if not isinstance(self.inputs, list) or len(self.inputs) < 2:
-            raise ValueError("Inputs must be a list with at least two numbers.")
-        result = self.inputs[0]
-        for value in self.inputs[1:]:
-            result -= value
-        return result
+    @staticmethod
+    def compute(inputs: Any) -> float:
+        return compute_subtraction(inputs)
 
 
 # Subclass for Multiplication
@@ -130,13 +163,9 @@ class Multiplication(Calculation):
         'polymorphic_identity': 'multiplication',
     }
 
-    def get_result(self) -> float:
-        if not isinstance(self.inputs, list):
-            raise ValueError("Inputs must be a list of numbers.")
-        result = 1
-        for value in self.inputs:
-            result *= value
-        return result
+    @staticmethod
+    def compute(inputs: Any) -> float:
+        return compute_multiplication(inputs)
 
 
 # Subclass for Division
@@ -145,15 +174,9 @@ class Division(Calculation):
         'polymorphic_identity': 'division',
     }
 
-    def get_result(self) -> float:
-        if not isinstance(self.inputs, list) or len(self.inputs) < 2:
-            raise ValueError("Inputs must be a list with at least two numbers.")
-        result = self.inputs[0]
-        for value in self.inputs[1:]:
-            if value == 0:
-                raise ValueError("Cannot divide by zero.")
-            result /= value
-        return result
+    @staticmethod
+    def compute(inputs: Any) -> float:
+        return compute_division(inputs)
 
 # Subclass for Power
 class Power(Calculation):
@@ -161,11 +184,9 @@ class Power(Calculation):
         'polymorphic_identity': 'power',
     }
 
-    def get_result(self) -> float:
-        if not isinstance(self.inputs, list) or len(self.inputs) != 2:
-            raise ValueError("Inputs must be a list with exactly two numbers for power operation.")
-        base, exponent = self.inputs
-        return base ** exponent
+    @staticmethod
+    def compute(inputs: Any) -> float:
+        return compute_power(inputs)
 
 # Subclass for Modulus
 class Modulus(Calculation):
@@ -173,10 +194,631 @@ class Modulus(Calculation):
         'polymorphic_identity': 'modulus',
     }
 
-    def get_result(self) -> float:
-        if not isinstance(self.inputs, list) or len(self.inputs) != 2:
-            raise ValueError("Inputs must be a list with exactly two numbers for modulus operation.")
-        dividend, divisor = self.inputs
-        if divisor == 0:
-            raise ValueError("Cannot perform modulus by zero!")
-        return dividend % divisor
\ No newline at end of file
+    @staticmethod
+    def compute(inputs: Any) -> float:
+        return compute_modulus(inputs)
+
+# Subclass for modular exponentiation
+class PowerMod(Calculation):
+    __mapper_args__ = {
+        'polymorphic_identity': 'power_mod',
+    }
+
+    @staticmethod
+    def compute(inputs: Any) -> float:
+        return compute_power_mod(inputs)
+
+
+# ------------------------- Evaluation Engine Start -------------------------
+# Reductions behind each subclass's compute, written against plain lists so
+# they can also evaluate (type, inputs) rows without hydrating ORM objects.
+
+def _sum(values: Sequence) -> float:
+    """
+    Sum values exactly for integers and with compensated (math.fsum)
+    summation as soon as a float is involved.
+    """
+    # The check stops at the first non-int, so float inputs are read once
+    if all(type(value) is int for value in values):
+        return sum(values)
+    return math.fsum(values)
+
+
+def compute_addition(inputs: Any) -> float:
+    if not isinstance(inputs, list):
+        raise ValueError("Inputs must be a list of numbers.")
+    return _sum(inputs)
+
+
+def compute_subtraction(inputs: Any) -> float:
+    if not isinstance(inputs, list) or len(inputs) < 2:
+        raise ValueError("Inputs must be a list with at least two numbers.")
+    return inputs[0] - _sum(inputs[1:])
+
+
+def compute_multiplication(inputs: Any) -> float:
+    if not isinstance(inputs, list):
+        raise ValueError("Inputs must be a list of numbers.")
+    return math.prod(inputs)
+
+
+def compute_division(inputs: Any) -> float:
+    if not isinstance(inputs, list) or len(inputs) < 2:
+        raise ValueError("Inputs must be a list with at least two numbers.")
+    divisors = inputs[1:]
+    if 0 in divisors:
+        raise ValueError("Cannot divide by zero.")
+    denominator = math.prod(divisors)
+    if denominator != 0 and (isinstance(denominator, int) or math.isfinite(denominator)):
+        return inputs[0] / denominator
+    # The product under- or overflowed; divide step by step instead
+    result = inputs[0]
+    for value in divisors:
+        result /= value
+    return result
+
+
+def compute_power(inputs: Any) -> float:
+    if not isinstance(inputs, list) or len(inputs) != 2:
+        raise ValueError("Inputs must be a list with exactly two numbers for power operation.")
+    # power() refuses results beyond the float range before computing them
+    return power(*inputs)
+
+
+def compute_modulus(inputs: Any) -> float:
+    if not isinstance(inputs, list) or len(inputs) != 2:
+        raise ValueError("Inputs must be a list with exactly two numbers for modulus operation.")
+    dividend, divisor = inputs
+    if divisor == 0:
+        raise ValueError("Cannot perform modulus by zero!")
+    return dividend % divisor
+
+
+def compute_power_mod(inputs: Any) -> float:
+    if not isinstance(inputs, list) or len(inputs) != 3:
+        raise ValueError("Inputs must be a list with exactly three numbers for power_mod operation.")
+    return power_mod(*inputs)
+
+
+def compute_result(calculation_type: str, inputs: Any) -> float:
+    """
+    Compute the result for a calculation type and its inputs, with the same
+    semantics and errors as the matching Calculation subclass's get_result.
+    """
+    return Calculation.class_for(calculation_type).compute(inputs)
+
+
+def compute_results(
+    rows: Iterable[Union['Calculation', Tuple[str, Any]]],
+    return_exceptions: bool = False,
+) -> List[Any]:
+    """
+    Compute results for many calculations at once.
+
+    Rows may be Calculation instances or (type, inputs) tuples, e.g. straight
+    from session.execute(select(Calculation.type, Calculation.inputs)). With
+    return_exceptions=True a failing row yields its exception instead of
+    aborting the whole evaluation.
+    """
+    results = []
+    functions = {}  # compute of each type seen so far
+    for row in rows:
+        calculation_type, inputs = (row.type, row.inputs) if isinstance(row, Calculation) else row
+        try:
+            func = functions.get(calculation_type)
+            if func is None:
+                func = functions[calculation_type] = Calculation.class_for(calculation_type).compute
+            results.append(func(inputs))
+        except (ValueError, ArithmeticError, TypeError) as e:
+            if not return_exceptions:
+                raise
+            results.append(e)
+    return results
+
+# -------------------------- Evaluation Engine End --------------------------
+
+
+# -------------------------- Stored Result Start ---------------------------
+# Calculation.result caches get_result() in SQL. It is filled on insert,
+# recomputed when inputs change through the ORM, and backfilled for rows
+# written before the column existed (or through Core statements).
+
+def storable_result(calculation_type: str, inputs: Any) -> Optional[float]:
+    """
+    Compute the value to store in Calculation.result, or None when the
+    calculation has no finite real result (e.g. division by zero).
+    """
+    try:
+        result = float(compute_result(calculation_type, inputs))
+    except (ValueError, ArithmeticError, TypeError):
+        return None
+    return result if math.isfinite(result) else None
+
+
+@event.listens_for(Calculation, "before_insert", propagate=True)
+def _store_result_on_insert(mapper, connection, target):
+    target.result = storable_result(target.type, target.inputs)
+
+
+@event.listens_for(Calculation, "before_update", propagate=True)
+def _refresh_result_on_update(mapper, connection, target):
+    if inspect(target).attrs.inputs.history.has_changes():
+        target.result = storable_result(target.type, target.inputs)
+
+
+def backfill_results(session: Session, batch_size: int = 1000) -> int:
+    """
+    Fill Calculation.result for rows where it is NULL, batch_size rows at a
+    time with one commit per batch, and return the number of rows updated.
+
+    Safe to run in the background while the app is serving; rows whose result
+    cannot be computed stay NULL and are skipped. Each batch's new results are
+    merged into the existing calculation_stats rows, which already count the
+    rows themselves (as rows without a result).
+    """
+    table = Calculation.__table__
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("_id"))
+        .values(result=bindparam("_result"))
+    )
+    updated = 0
+    last_id = None
+    while True:
+        query = select(table.c.id, table.c.user_id, table.c.type, table.c.inputs).where(table.c.result.is_(None))
+        if last_id is not None:
+            query = query.where(table.c.id > last_id)
+        rows = session.execute(query.order_by(table.c.id).limit(batch_size)).all()
+        if not rows:
+            return updated
+        last_id = rows[-1].id
+        computed = [
+            (row, result)
+            for row in rows
+            if (result := storable_result(row.type, row.inputs)) is not None
+        ]
+        if computed:
+            session.execute(statement, [{"_id": row.id, "_result": result} for row, result in computed])
+            updated += len(computed)
+            # Core updates bypass the rollup's mapper events
+            _add_results_to_stats(
+                session.connection(), [(row.user_id, row.type, result) for row, result in computed]
+            )
+        session.commit()
+
+
+def upgrade_schema(connection) -> List[str]:
+    """
+    Bring a database created by an earlier version up to date, and return a
+    description of each change made. create_all only creates missing tables
+    (with their indexes), so columns and indexes added to an existing table
+    since are added here. Safe to run repeatedly.
+    """
+    Base.metadata.create_all(connection)
+    changes = []
+    table = Calculation.__table__
+    inspector = inspect(connection)
+    columns = {column["name"] for column in inspector.get_columns(table.name)}
+    if "result" not in columns:
+        column_type = table.c.result.type.compile(dialect=connection.dialect)
+        connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN result {column_type}"))
+        changes.append(f"Added column {table.name}.result")
+    indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+    for index in sorted(table.indexes, key=lambda index: index.name):
+        if index.name not in indexes:
+            # checkfirst skips it if another process created it meanwhile
+            index.create(connection, checkfirst=True)
+            changes.append(f"Created index {index.name}")
+    return changes
+
+# --------------------------- Stored Result End ----------------------------
+
+
+# ------------------------- Loading Strategies Start ------------------------
+# Calculation no longer sets with_polymorphic='*'; callers pick what to load:
+# - select_calculations: ORM objects, optionally only some subclasses
+# - select_calculation_columns: plain rows, no ORM objects are created
+# - load_user_with_calculations: a user plus history in one extra SELECT
+
+# Columns returned by select_calculation_columns by default
+CALCULATION_COLUMNS = ('id', 'type', 'inputs', 'result', 'created_at')
+
+
+def calculation_classes(types: Sequence[str]) -> list:
+    """
+    Map polymorphic identities (e.g. 'addition') to Calculation subclasses.
+    """
+    polymorphic_map = Calculation.__mapper__.polymorphic_map
+    try:
+        return [polymorphic_map[t].class_ for t in types]
+    except KeyError as e:
+        raise ValueError(f"Unsupported calculation type: {e.args[0]}")
+
+
+def select_calculations(user_id: Optional[uuid.UUID] = None, types: Optional[Sequence[str]] = None):
+    """
+    Build an ORM SELECT for calculations, limited to the given types.
+    """
+    if types:
+        entity = with_polymorphic(Calculation, calculation_classes(types))
+        statement = select(entity).where(entity.type.in_(types))
+    else:
+        statement = select(Calculation)
+    if user_id is not None:
+        statement = statement.where(Calculation.user_id == user_id)
+    return statement
+
+
+def select_calculation_columns(
+    *columns: str,
+    user_id: Optional[uuid.UUID] = None,
+    types: Optional[Sequence[str]] = None,
+):
+    """
+    Build a column-only SELECT over the calculations table. Results are
+    lightweight rows instead of ORM objects.
+    """
+    table = Calculation.__table__
+    statement = select(*(table.c[name] for name in (columns or CALCULATION_COLUMNS)))
+    if types:
+        statement = statement.where(table.c.type.in_(types))
+    if user_id is not None:
+        statement = statement.where(table.c.user_id == user_id)
+    return statement
+
+
+def load_user_with_calculations(session: Session, user_id: uuid.UUID) -> Optional[User]:
+    """
+    Load a user with User.calculations populated by a single selectin query.
+    """
+    return session.get(User, user_id, options=[selectinload(User.calculations)])
+
+# -------------------------- Loading Strategies End -------------------------
+
+
+# ------------------------- Keyset Pagination Start -------------------------
+# A user's history is paged newest-first by (created_at, id), matching the
+# (user_id, created_at, id) index. The cursor holds the last row's sort key,
+# so every page is one index range scan however deep it is.
+
+def encode_cursor(created_at: datetime, calculation_id: uuid.UUID) -> str:
+    """
+    Encode the sort key of the last row on a page as an opaque cursor.
+    """
+    raw = json.dumps([created_at.isoformat(), str(calculation_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Decode a cursor from encode_cursor. Raises ValueError if it is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, calculation_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), uuid.UUID(calculation_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def select_calculation_page(
+    user_id: uuid.UUID,
+    limit: int,
+    cursor: Optional[str] = None,
+    types: Optional[Sequence[str]] = None,
+):
+    """
+    Build a column-only SELECT for one page of a user's history, newest
+    first. It fetches limit + 1 rows; the extra row only signals that another
+    page exists.
+    """
+    if types:
+        calculation_classes(types)  # Reject unknown discriminator values
+    table = Calculation.__table__
+    statement = select_calculation_columns(user_id=user_id, types=types)
+    if cursor is not None:
+        created_at, calculation_id = decode_cursor(cursor)
+        statement = statement.where(
+            tuple_(table.c.created_at, table.c.id) < (created_at, calculation_id)
+        )
+    return statement.order_by(table.c.created_at.desc(), table.c.id.desc()).limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int) -> Tuple[Sequence[Any], Optional[str]]:
+    """
+    Split the rows of select_calculation_page into the page and the cursor of
+    the next page (None on the last page).
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(page[-1].created_at, page[-1].id)
+
+# -------------------------- Keyset Pagination End --------------------------
+
+
+# ---------------------------- Stats Rollup Start ----------------------------
+# calculation_stats holds one row per (user, type) with the count, result
+# aggregates and most recent calculation, kept up to date by mapper events
+# on every ORM insert, update and delete of a Calculation. Reading a user's
+# stats is then a primary-key range read instead of a scan of their history.
+#
+# Inserts and most deletes adjust the row in place. Deleting (or changing)
+# the row that holds a group's min, max or latest value recomputes that one
+# group, since those aggregates cannot be decremented. Rows written through
+# Core statements bypass the events; rebuild_calculation_stats recomputes the
+# whole table after such bulk loads.
+
+class CalculationStats(Base):
+    __tablename__ = 'calculation_stats'
+
+    user_id = Column(PG_UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    type = Column(String(50), primary_key=True)  # Calculation.type
+    count = Column(Integer, nullable=False)  # Calculations of this type
+    result_count = Column(Integer, nullable=False)  # Of which have a stored result
+    result_sum = Column(Float, nullable=True)  # Aggregates over non-NULL results
+    result_min = Column(Float, nullable=True)
+    result_max = Column(Float, nullable=True)
+    last_created_at = Column(DateTime, nullable=True)
+    last_calculation_id = Column(PG_UUID(as_uuid=True), nullable=True)
+
+    def __repr__(self):
+        return f"<CalculationStats(user_id={self.user_id}, type={self.type}, count={self.count})>"
+
+
+def _merged_results(new) -> dict:
+    """
+    SET clause merging result aggregates (`new`, indexable by column name)
+    into an existing calculation_stats row.
+    """
+    table = CalculationStats.__table__
+    return {
+        "result_count": table.c.result_count + new["result_count"],
+        "result_sum": case(
+            (new["result_sum"].is_(None), table.c.result_sum),
+            else_=func.coalesce(table.c.result_sum, 0) + new["result_sum"],
+        ),
+        "result_min": case(
+            (or_(table.c.result_min.is_(None), new["result_min"] < table.c.result_min), new["result_min"]),
+            else_=table.c.result_min,
+        ),
+        "result_max": case(
+            (or_(table.c.result_max.is_(None), new["result_max"] > table.c.result_max), new["result_max"]),
+            else_=table.c.result_max,
+        ),
+    }
+
+
+def _merged_stats(new) -> dict:
+    """
+    SET clause merging one calculation's values (`new`, indexable by column
+    name) into an existing calculation_stats row.
+    """
+    table = CalculationStats.__table__
+    is_latest = or_(
+        table.c.last_created_at.is_(None),
+        tuple_(new["last_created_at"], new["last_calculation_id"])
+        > tuple_(table.c.last_created_at, table.c.last_calculation_id),
+    )
+    return {
+        "count": table.c.count + 1,
+        **_merged_results(new),
+        "last_created_at": case((is_latest, new["last_created_at"]), else_=table.c.last_created_at),
+        "last_calculation_id": case((is_latest, new["last_calculation_id"]), else_=table.c.last_calculation_id),
+    }
+
+
+def _add_to_stats(connection, user_id, calculation_type, result, created_at, calculation_id) -> None:
+    """
+    Count one calculation into its (user, type) rollup row, creating it if needed.
+    """
+    table = CalculationStats.__table__
+    values = {
+        "user_id": user_id,
+        "type": calculation_type,
+        "count": 1,
+        "result_count": int(result is not None),
+        "result_sum": result,
+        "result_min": result,
+        "result_max": result,
+        "last_created_at": created_at,
+        "last_calculation_id": calculation_id,
+    }
+    upsert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(connection.dialect.name)
+    if upsert is not None:
+        statement = upsert(table).values(values)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.type],
+            set_=_merged_stats(statement.excluded),
+        ))
+        return
+    # No portable upsert: update, and insert if there was no row yet
+    new = {name: literal(value, table.c[name].type) for name, value in values.items()}
+    updated = connection.execute(
+        update(table)
+        .where(table.c.user_id == user_id, table.c.type == calculation_type)
+        .values(_merged_stats(new))
+    )
+    if updated.rowcount == 0:
+        connection.execute(insert(table).values(values))
+
+
+def _add_results_to_stats(connection, results: Iterable[Tuple[Any, str, float]]) -> None:
+    """
+    Merge (user_id, type, result) results of calculations already counted
+    without one into their rollup rows, with one UPDATE per (user, type).
+    """
+    groups = {}
+    for user_id, calculation_type, result in results:
+        groups.setdefault((user_id, calculation_type), []).append(result)
+    table = CalculationStats.__table__
+    new = {
+        name: bindparam(f"_{name}", type_=table.c[name].type)
+        for name in ("result_count", "result_sum", "result_min", "result_max")
+    }
+    statement = (
+        update(table)
+        .where(table.c.user_id == bindparam("_user_id"), table.c.type == bindparam("_type"))
+        .values(_merged_results(new))
+    )
+    connection.execute(statement, [
+        {
+            "_user_id": user_id,
+            "_type": calculation_type,
+            "_result_count": len(values),
+            "_result_sum": math.fsum(values),
+            "_result_min": min(values),
+            "_result_max": max(values),
+        }
+        for (user_id, calculation_type), values in groups.items()
+    ])
+
+
+def _aggregate_stats(connection, *criteria) -> List[dict]:
+    """
+    Compute calculation_stats rows from the calculations table for the
+    (user, type) groups matching criteria.
+    """
+    calculations = Calculation.__table__
+    aggregates = connection.execute(
+        select(
+            calculations.c.user_id,
+            calculations.c.type,
+            func.count().label("count"),
+            func.count(calculations.c.result).label("result_count"),
+            func.sum(calculations.c.result).label("result_sum"),
+            func.min(calculations.c.result).label("result_min"),
+            func.max(calculations.c.result).label("result_max"),
+        )
+        .where(*criteria)
+        .group_by(calculations.c.user_id, calculations.c.type)
+    ).mappings().all()
+    ranked = (
+        select(
+            calculations.c.user_id,
+            calculations.c.type,
+            calculations.c.created_at,
+            calculations.c.id,
+            func.row_number().over(
+                partition_by=(calculations.c.user_id, calculations.c.type),
+                order_by=(calculations.c.created_at.desc(), calculations.c.id.desc()),
+            ).label("rank"),
+        )
+        .where(*criteria)
+        .subquery()
+    )
+    latest = {
+        (row.user_id, row.type): row
+        for row in connection.execute(select(ranked).where(ranked.c.rank == 1))
+    }
+    rows = []
+    for aggregate in aggregates:
+        last = latest[(aggregate["user_id"], aggregate["type"])]
+        rows.append({**aggregate, "last_created_at": last.created_at, "last_calculation_id": last.id})
+    return rows
+
+
+def refresh_calculation_stats(connection, user_id, calculation_type: str) -> None:
+    """
+    Recompute one (user, type) rollup row from the calculations table.
+    """
+    calculations = Calculation.__table__
+    stats = CalculationStats.__table__
+    connection.execute(delete(stats).where(stats.c.user_id == user_id, stats.c.type == calculation_type))
+    rows = _aggregate_stats(
+        connection, calculations.c.user_id == user_id, calculations.c.type == calculation_type
+    )
+    if rows:
+        connection.execute(insert(stats), rows)
+
+
+def _remove_from_stats(connection, user_id, calculation_type, result, calculation_id) -> bool:
+    """
+    Take one calculation out of its (user, type) rollup row. Returns True if
+    the group was instead recomputed from the (already written) table.
+    """
+    table = CalculationStats.__table__
+    key = and_(table.c.user_id == user_id, table.c.type == calculation_type)
+    row = connection.execute(select(table).where(key)).first()
+    if row is None:
+        return False
+    if row.count <= 1:
+        connection.execute(delete(table).where(key))
+    elif (
+        (result is not None and result in (row.result_min, row.result_max))
+        or calculation_id == row.last_calculation_id
+    ):
+        refresh_calculation_stats(connection, user_id, calculation_type)
+        return True
+    else:
+        values = {"count": table.c.count - 1}
+        if result is not None:
+            values["result_count"] = table.c.result_count - 1
+            values["result_sum"] = table.c.result_sum - result
+        connection.execute(update(table).where(key).values(values))
+    return False
+
+
+# Columns whose change moves a calculation's contribution to the rollup
+_STATS_COLUMNS = ("user_id", "type", "result", "created_at")
+
+
+@event.listens_for(Calculation, "after_insert", propagate=True)
+def _count_inserted_calculation(mapper, connection, target):
+    _add_to_stats(connection, target.user_id, target.type, target.result, target.created_at, target.id)
+
+
+@event.listens_for(Calculation, "after_delete", propagate=True)
+def _uncount_deleted_calculation(mapper, connection, target):
+    _remove_from_stats(connection, target.user_id, target.type, target.result, target.id)
+
+
+@event.listens_for(Calculation, "before_update", propagate=True)
+def _remember_counted_calculation(mapper, connection, target):
+    # Attribute history has no old value for attributes that were expired
+    # when set (e.g. after a commit), so read the counted row back instead
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in _STATS_COLUMNS):
+        table = Calculation.__table__
+        state.info["stats_previous"] = connection.execute(
+            select(*(table.c[name] for name in _STATS_COLUMNS)).where(table.c.id == target.id)
+        ).first()
+
+
+@event.listens_for(Calculation, "after_update", propagate=True)
+def _recount_updated_calculation(mapper, connection, target):
+    old = inspect(target).info.pop("stats_previous", None)
+    if old is None:
+        return
+    refreshed = _remove_from_stats(connection, old.user_id, old.type, old.result, target.id)
+    if refreshed and (old.user_id, old.type) == (target.user_id, target.type):
+        return  # The recompute already saw the updated row
+    _add_to_stats(connection, target.user_id, target.type, target.result, target.created_at, target.id)
+
+
+def select_calculation_stats(user_id: uuid.UUID):
+    """
+    Build the SELECT for a user's rollup rows, one per calculation type.
+    """
+    return (
+        select(CalculationStats)
+        .where(CalculationStats.user_id == user_id)
+        .order_by(CalculationStats.type)
+    )
+
+
+def rebuild_calculation_stats(session: Session) -> int:
+    """
+    Recompute calculation_stats from scratch, e.g. after rows were written
+    with Core bulk inserts. Returns the number of rollup rows written.
+    """
+    connection = session.connection()
+    stats = CalculationStats.__table__
+    connection.execute(delete(stats))
+    rows = _aggregate_stats(connection)
+    if rows:
+        connection.execute(insert(stats), rows)
+    session.commit()
+    return len(rows)
+
+# ----------------------------- Stats Rollup End -----------------------------
@@ -0,0 +1,159 @@
+# app/database/__init__.py
+
+"""
+Module: database
+
+Async SQLAlchemy engine and per-request AsyncSession for the FastAPI app.
+The engine is created by the app lifespan and disposed on shutdown.
+"""
+
+import logging
+from typing import AsyncIterator, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import URL, event
+from sqlalchemy.exc import ArgumentError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.calculation import upgrade_schema
+from app.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Sync driver prefixes and their async equivalents
+ASYNC_DRIVERS = {
+    "postgresql://": "postgresql+asyncpg://",
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+    "sqlite://": "sqlite+aiosqlite://",
+}
+
+
+def to_async_url(url: str) -> str:
+    """
+    Rewrite a sync database URL (as used by user_seed.py and docker-compose)
+    to use an async driver.
+    """
+    for sync_prefix, async_prefix in ASYNC_DRIVERS.items():
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+
+def database_url_from_settings() -> Optional[str]:
+    """
+    Build the async PostgreSQL URL from the db_* Settings, or return None if
+    they are not configured.
+    """
+    try:
+        settings = Settings()
+    except ValidationError:
+        return None
+    url = URL.create(
+        "postgresql+asyncpg",
+        username=settings.db_user,
+        password=settings.db_password,
+        host=settings.db_host,
+        port=settings.db_port,
+        database=settings.db_name,
+    )
+    return url.render_as_string(hide_password=False)
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+class Database:
+    """
+    Owns the async engine and session factory. When url is None the database
+    is disabled and get_session yields None.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str],
+        pool_size: int = 10,
+        max_overflow: int = 20,
+        pool_timeout: float = 30.0,
+        pool_recycle: int = 1800,
+        create_tables: bool = False,
+    ):
+        self.url = to_async_url(url) if url else None
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.create_tables = create_tables
+        self.engine: Optional[AsyncEngine] = None
+        self._sessionmaker: Optional[async_sessionmaker] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.url is not None
+
+    async def startup(self) -> None:
+        """
+        Create the engine and session factory. Called from the app lifespan.
+        """
+        if not self.enabled or self.engine is not None:
+            return
+        engine_options = {"pool_pre_ping": True}
+        if not self.url.startswith("sqlite"):
+            # SQLite does not use a sized connection pool
+            engine_options.update(
+                pool_size=self.pool_size,
+                max_overflow=self.max_overflow,
+                pool_timeout=self.pool_timeout,
+                pool_recycle=self.pool_recycle,
+            )
+        try:
+            self.engine = create_async_engine(self.url, **engine_options)
+        except (ArgumentError, ValueError) as e:
+            logger.error(f"Invalid database URL, saving calculations is disabled: {e}")
+            self.url = None
+            return
+        if self.url.startswith("sqlite"):
+            # Enforce foreign keys like PostgreSQL does
+            event.listen(self.engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
+        self._sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+        if self.create_tables:
+            async with self.engine.begin() as connection:
+                for change in await connection.run_sync(upgrade_schema):
+                    logger.info(f"Schema upgrade: {change}")
+        logger.info("Database engine started.")
+
+    async def shutdown(self) -> None:
+        """
+        Dispose of the engine and its pooled connections.
+        """
+        if self.engine is not None:
+            await self.engine.dispose()
+            self.engine = None
+            self._sessionmaker = None
+
+    @property
+    def is_started(self) -> bool:
+        return self._sessionmaker is not None
+
+    def session(self) -> AsyncSession:
+        """
+        Open an AsyncSession outside of the request dependency, for work that
+        outlives the handler (streaming responses) or for scripts. Use it as
+        `async with database.session() as session`.
+        """
+        if self._sessionmaker is None:
+            raise RuntimeError("The database is not started.")
+        return self._sessionmaker()
+
+    async def get_session(self) -> AsyncIterator[Optional[AsyncSession]]:
+        """
+        FastAPI dependency yielding one AsyncSession per request. No connection
+        is checked out until the session is first used.
+        """
+        if self._sessionmaker is None:
+            yield None
+            return
+        async with self._sessionmaker() as session:
+            yield session
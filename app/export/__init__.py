@@ -0,0 +1,195 @@
+# app/export/__init__.py
+
+"""
+Module: export
+
+Streaming export of a user's calculation history. Rows are read through a
+server-side cursor in batches of `batch_size` and each batch is serialized
+as soon as it arrives, so memory stays flat however many rows are exported.
+
+Formats: newline-delimited JSON, CSV, and the Arrow IPC stream format
+(pyarrow is imported only when Arrow is requested).
+"""
+
+import csv
+from abc import ABC, abstractmethod
+import io
+import json
+import uuid
+from typing import AsyncIterator, Dict, Optional, Sequence, Type
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.calculation import CALCULATION_COLUMNS, Calculation, calculation_classes, select_calculation_columns
+
+# Rows fetched from the server-side cursor per batch
+EXPORT_BATCH_SIZE = 1000
+
+
+def _json_row(row) -> dict:
+    return {
+        "id": str(row.id),
+        "type": row.type,
+        "inputs": row.inputs,
+        "result": row.result,
+        "created_at": row.created_at.isoformat(),
+    }
+
+
+class Encoder(ABC):
+    """
+    Serializes batches of calculation rows. header() and footer() frame the
+    output; encode() is called once per batch.
+    """
+
+    media_type = "application/octet-stream"
+    extension = "bin"
+
+    def header(self) -> bytes:
+        return b""
+
+    @abstractmethod
+    def encode(self, rows: Sequence) -> bytes:
+        ...
+
+    def footer(self) -> bytes:
+        return b""
+
+
+class NDJSONEncoder(Encoder):
+    """
+    One JSON object per line.
+    """
+
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def encode(self, rows: Sequence) -> bytes:
+        return "".join(json.dumps(_json_row(row), separators=(",", ":")) + "\n" for row in rows).encode()
+
+
+class CSVEncoder(Encoder):
+    """
+    CSV with a header row; inputs are written as a JSON array.
+    """
+
+    media_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue().encode()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def header(self) -> bytes:
+        self._writer.writerow(CALCULATION_COLUMNS)
+        return self._drain()
+
+    def encode(self, rows: Sequence) -> bytes:
+        self._writer.writerows(
+            (row.id, row.type, json.dumps(row.inputs), "" if row.result is None else row.result,
+             row.created_at.isoformat())
+            for row in rows
+        )
+        return self._drain()
+
+
+class ArrowEncoder(Encoder):
+    """
+    Arrow IPC stream: the schema, then one record batch per fetched batch.
+    """
+
+    media_type = "application/vnd.apache.arrow.stream"
+    extension = "arrow"
+
+    def __init__(self):
+        import pyarrow as pa  # Imported lazily; only Arrow exports need it
+
+        self._pa = pa
+        self._schema = pa.schema([
+            ("id", pa.string()),
+            ("type", pa.string()),
+            ("inputs", pa.list_(pa.float64())),
+            ("result", pa.float64()),
+            ("created_at", pa.timestamp("us")),
+        ])
+        self._buffer = io.BytesIO()
+        self._writer = pa.ipc.new_stream(self._buffer, self._schema)
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def header(self) -> bytes:
+        return self._drain()  # The schema message written by new_stream
+
+    def encode(self, rows: Sequence) -> bytes:
+        if not rows:
+            return b""
+        self._writer.write_batch(self._pa.record_batch([
+            [str(row.id) for row in rows],
+            [row.type for row in rows],
+            [[float(value) for value in row.inputs] for row in rows],
+            [row.result for row in rows],
+            [row.created_at for row in rows],
+        ], schema=self._schema))
+        return self._drain()
+
+    def footer(self) -> bytes:
+        self._writer.close()  # Writes the end-of-stream marker
+        return self._drain()
+
+
+EXPORT_FORMATS: Dict[str, Type[Encoder]] = {
+    "ndjson": NDJSONEncoder,
+    "csv": CSVEncoder,
+    "arrow": ArrowEncoder,
+}
+
+
+def export_encoder(fmt: str) -> Encoder:
+    """
+    Create the encoder for an export format. Raises ValueError for unknown
+    formats, or for Arrow when pyarrow is not installed.
+    """
+    encoder_class = EXPORT_FORMATS.get(fmt)
+    if encoder_class is None:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    try:
+        return encoder_class()
+    except ImportError:
+        raise ValueError(f"The {fmt} export format requires pyarrow.")
+
+
+def select_export(user_id: uuid.UUID, types: Optional[Sequence[str]] = None, batch_size: int = EXPORT_BATCH_SIZE):
+    """
+    Build the export SELECT: a user's calculations oldest first (served by
+    the (user_id, created_at, id) index), fetched batch_size rows at a time
+    from a server-side cursor.
+    """
+    if types:
+        calculation_classes(types)  # Reject unknown discriminator values
+    table = Calculation.__table__
+    return (
+        select_calculation_columns(user_id=user_id, types=types)
+        .order_by(table.c.created_at, table.c.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+
+async def export_calculations(session: AsyncSession, statement, encoder: Encoder) -> AsyncIterator[bytes]:
+    """
+    Stream the rows of an export SELECT through encoder, one chunk per batch.
+    """
+    yield encoder.header()
+    result = await session.stream(statement)
+    async for rows in result.partitions():
+        yield encoder.encode(rows)
+    yield encoder.footer()
@@ -0,0 +1,221 @@
+# app/expressions/__init__.py
+
+"""
+Module: expressions
+
+Arithmetic expressions over the registered operations, e.g. "(a + b) * c % d"
+or "power_mod(x, y, 97) + 1". An expression is parsed with the ast module,
+checked against a whitelist (numbers, variables, + - * / % **, unary signs
+and calls to registered operations) and compiled into a Plan: a flat list of
+operation steps in evaluation order, with repeated subexpressions computed
+once. Nothing in the expression is ever passed to eval.
+
+Plans are cached by expression text, so a repeated formula is only bound to
+its variables and run.
+"""
+
+import ast
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from app.operations import FLOAT_MAX_BITS, CostLimitError, Number
+from app.operations.registry import OPERATIONS, OperationSpec
+
+# Longest expression accepted, in characters
+MAX_EXPRESSION_LENGTH = 1000
+
+# Most operation steps a compiled expression may have
+MAX_STEPS = 200
+
+# Operation for each binary operator
+_BINARY_OPERATIONS = {
+    ast.Add: "add",
+    ast.Sub: "subtract",
+    ast.Mult: "multiply",
+    ast.Div: "divide",
+    ast.Mod: "modulus",
+    ast.Pow: "power",
+}
+
+
+class ExpressionError(ValueError):
+    """
+    Raised for expressions that cannot be parsed or use anything outside the
+    whitelist, and for evaluations missing a variable.
+    """
+
+
+@dataclass(frozen=True)
+class Plan:
+    """
+    A compiled expression. Evaluation fills a register list with the
+    constants, then the variables, then each step's result in turn; a step
+    names the registers holding its operands.
+    """
+    expression: str
+    constants: Tuple[Number, ...]
+    variables: Tuple[str, ...]  # Variable names, in register order
+    steps: Tuple[Tuple[OperationSpec, Tuple[int, ...]], ...]
+    result: int  # Register holding the value of the whole expression
+
+    def evaluate(self, variables: Mapping[str, Number], max_int_bits: int = FLOAT_MAX_BITS) -> Number:
+        """
+        Run the plan with the given variable values.
+
+        Every step is bounded, so a plan runs inline in time linear in its
+        length: steps over their operation's max_cost are refused before
+        running, and so is any step producing an integer wider than
+        max_int_bits. The result is returned as a float anyway, so a
+        wider intermediate could only matter for a later modulus, which
+        power_mod computes without one.
+        """
+        missing = [name for name in self.variables if name not in variables]
+        if missing:
+            raise ExpressionError(f"Missing value for {', '.join(missing)}.")
+        registers = [*self.constants, *(variables[name] for name in self.variables)]
+        for spec, operands in self.steps:
+            args = [registers[register] for register in operands]
+            spec.check_cost(*args)
+            value = spec.func(*args)
+            if isinstance(value, complex):
+                raise ValueError("Result is not a finite real number.")
+            if isinstance(value, int) and value.bit_length() > max_int_bits:
+                raise CostLimitError(
+                    f"Intermediate result would exceed {max_int_bits} bits; use power_mod for modular powers."
+                )
+            registers.append(value)
+        return registers[self.result]
+
+
+class _Compiler:
+    """
+    Walks a whitelisted expression tree and emits plan steps. Operands are
+    referenced as ("const", i), ("var", i) or ("step", i) until every
+    constant and variable is known, then mapped to registers.
+    """
+
+    def __init__(self):
+        self.constants: List[Number] = []
+        self.variables: List[str] = []
+        self.steps: List[Tuple[OperationSpec, Tuple[Tuple[str, int], ...]]] = []
+        self._seen: Dict[tuple, Tuple[str, int]] = {}
+
+    def _constant(self, value: Number) -> Tuple[str, int]:
+        # Keyed on type too, so 1 and 1.0 stay distinct
+        key = ("const", type(value), value)
+        if key not in self._seen:
+            self.constants.append(value)
+            self._seen[key] = ("const", len(self.constants) - 1)
+        return self._seen[key]
+
+    def _variable(self, name: str) -> Tuple[str, int]:
+        key = ("var", name)
+        if key not in self._seen:
+            self.variables.append(name)
+            self._seen[key] = ("var", len(self.variables) - 1)
+        return self._seen[key]
+
+    def _step(self, name: str, operands: List[Tuple[str, int]]) -> Tuple[str, int]:
+        key = ("step", name, tuple(operands))
+        if key not in self._seen:
+            if len(self.steps) >= MAX_STEPS:
+                raise ExpressionError(f"Expression has more than {MAX_STEPS} operations.")
+            self.steps.append((OPERATIONS[name], tuple(operands)))
+            self._seen[key] = ("step", len(self.steps) - 1)
+        return self._seen[key]
+
+    def visit(self, node: ast.AST) -> Tuple[str, int]:
+        if isinstance(node, ast.Constant):
+            if type(node.value) not in (int, float):
+                raise ExpressionError(f"Unsupported constant: {node.value!r}")
+            return self._constant(node.value)
+        if isinstance(node, ast.Name):
+            return self._variable(node.id)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+            if isinstance(node.op, ast.UAdd):
+                return self.visit(node.operand)
+            if isinstance(node.operand, ast.Constant) and type(node.operand.value) in (int, float):
+                return self._constant(-node.operand.value)
+            return self._step("subtract", [self._constant(0), self.visit(node.operand)])
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATIONS:
+            return self._step(_BINARY_OPERATIONS[type(node.op)], [self.visit(node.left), self.visit(node.right)])
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in OPERATIONS:
+            spec = OPERATIONS[node.func.id]
+            if node.keywords or len(node.args) != spec.arity:
+                raise ExpressionError(f"{spec.name} takes exactly {spec.arity} positional arguments.")
+            return self._step(spec.name, [self.visit(arg) for arg in node.args])
+        if isinstance(node, ast.Call):
+            raise ExpressionError(f"Unsupported function: {ast.unparse(node.func)}")
+        raise ExpressionError(f"Unsupported syntax: {ast.unparse(node)}")
+
+    def register(self, operand: Tuple[str, int]) -> int:
+        kind, index = operand
+        if kind == "const":
+            return index
+        if kind == "var":
+            return len(self.constants) + index
+        return len(self.constants) + len(self.variables) + index
+
+
+def compile_expression(expression: str) -> Plan:
+    """
+    Parse and compile an expression into a Plan. Raises ExpressionError if it
+    is not valid, whitelisted arithmetic.
+    """
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionError(f"Expression is longer than {MAX_EXPRESSION_LENGTH} characters.")
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression: {e.msg}")
+    except (MemoryError, RecursionError):
+        raise ExpressionError("Expression is nested too deeply.")
+    compiler = _Compiler()
+    try:
+        result = compiler.visit(tree.body)
+    except RecursionError:
+        raise ExpressionError("Expression is nested too deeply.")
+    return Plan(
+        expression=expression,
+        constants=tuple(compiler.constants),
+        variables=tuple(compiler.variables),
+        steps=tuple((spec, tuple(compiler.register(o) for o in operands)) for spec, operands in compiler.steps),
+        result=compiler.register(result),
+    )
+
+
+class PlanCache:
+    """
+    LRU cache of compiled plans keyed by expression text. Expressions that
+    fail to compile are not cached.
+
+    Parameters:
+    - maxsize (int): Maximum number of cached plans; 0 disables caching.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._plans: "OrderedDict[str, Plan]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def get(self, expression: str) -> Plan:
+        """
+        Return the plan for expression, compiling it on a miss.
+        """
+        plan = self._plans.get(expression)
+        if plan is not None:
+            self.hits += 1
+            self._plans.move_to_end(expression)
+            return plan
+        self.misses += 1
+        plan = compile_expression(expression)
+        if self.maxsize > 0:
+            self._plans[expression] = plan
+            if len(self._plans) > self.maxsize:
+                self._plans.popitem(last=False)
+        return plan
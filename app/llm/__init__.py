@@ -0,0 +1,149 @@
+# app/llm/__init__.py
+
+"""
+Module: llm
+
+Async client for the chat-completions function-calling endpoint. A single
+httpx.AsyncClient (and its connection pool) is shared by every request and is
+opened/closed by the FastAPI lifespan hooks. Function schemas are built once
+as a FunctionSet (see app.llm.functions) and sent as pre-encoded JSON.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import httpx
+
+from app.llm.functions import FunctionSet, function_schema
+
+logger = logging.getLogger(__name__)
+
+# (function_name, arguments) as returned by the model, or (None, None)
+FunctionCall = Tuple[Optional[str], Optional[Dict[str, Any]]]
+
+
+class MalformedResponseError(ValueError):
+    """
+    Raised when a successful upstream response is not a chat-completions
+    body of the expected shape.
+    """
+
+
+class LLMClient:
+    """
+    Pooled async client for the upstream chat-completions API.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        api_key: Optional[str],
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        pool_timeout: float = 5.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=read_timeout,
+            write=read_timeout,
+            pool=pool_timeout,
+        )
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self._transport = transport  # Tests inject an httpx.MockTransport here
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def startup(self) -> None:
+        """
+        Open the shared connection pool. Called from the app lifespan.
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+                timeout=self.timeout,
+                limits=self.limits,
+                transport=self._transport,
+            )
+
+    async def shutdown(self) -> None:
+        """
+        Close the shared connection pool. Called from the app lifespan.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def is_started(self) -> bool:
+        return self._client is not None
+
+    async def call_function(
+        self,
+        prompt: str,
+        functions: Union[FunctionSet, List[Dict[str, Any]]],
+        model: str,
+    ) -> FunctionCall:
+        """
+        Send a prompt with the available functions and return the function the
+        model chose to call, if any.
+
+        Raises:
+        - httpx.HTTPError: On transport errors, timeouts or non-2xx responses.
+        """
+        if self._client is None:
+            # Allow use outside of the app lifespan (scripts, tests)
+            await self.startup()
+
+        if isinstance(functions, FunctionSet):
+            response = await self._client.post(
+                self.endpoint, content=functions.encode_payload(prompt, model)
+            )
+        else:
+            payload = {
+                "model": model,
+                "messages": [{"role": "user", "content": prompt}],
+                "functions": functions,
+                "function_call": "auto",
+            }
+            response = await self._client.post(self.endpoint, json=payload)
+        response.raise_for_status()
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise MalformedResponseError(f"Response body is not JSON: {e}") from e
+        return parse_function_call(data)
+
+
+def parse_function_call(data: Any) -> FunctionCall:
+    """
+    Extract (function_name, arguments) from a chat-completions response body.
+    Returns (None, None) if the model did not call a function.
+
+    Raises:
+    - MalformedResponseError: If the body is not shaped like a chat-completions
+      response or the arguments are not a JSON object.
+    """
+    try:
+        message = data["choices"][0]["message"]
+
+        # Check if the model called a function
+        if "function_call" not in message:
+            return None, None
+        function_name = message["function_call"]["name"]
+        arguments = json.loads(message["function_call"]["arguments"])
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        raise MalformedResponseError(f"Malformed function call in response: {e!r}") from e
+    if not isinstance(function_name, str) or not isinstance(arguments, dict):
+        raise MalformedResponseError("Malformed function call in response: expected a name and an arguments object.")
+    return function_name, arguments
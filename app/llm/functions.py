@@ -0,0 +1,126 @@
+# app/llm/functions.py
+
+"""
+Module: functions
+
+Function-calling schema generated from Python callables. The schema is built
+and serialized to JSON once; each request only encodes its prompt and model
+and splices them into the pre-encoded payload bytes.
+"""
+
+import inspect
+import json
+import re
+import typing
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+# Matches "- a (int or float): The first number." in a Parameters: section
+_PARAMETER_LINE = re.compile(r"^-\s*(\w+)\s*\([^)]*\)\s*:\s*(.+)$")
+
+_JSON_TYPES = {int: "integer", float: "number", str: "string", bool: "boolean"}
+
+
+def _json_type(annotation: Any) -> str:
+    """
+    Map a parameter annotation to a JSON schema type. Unions of numeric types
+    (such as app.operations.Number) are "number".
+    """
+    if annotation in _JSON_TYPES:
+        return _JSON_TYPES[annotation]
+    members = typing.get_args(annotation)
+    if members and all(member in (int, float) for member in members):
+        return "number"
+    return "string"
+
+
+def _parse_docstring(doc: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Return the summary (the first paragraph, joined into one line) and the
+    per-parameter descriptions of a docstring written in the app.operations
+    style.
+    """
+    lines = [line.strip() for line in inspect.cleandoc(doc or "").splitlines()]
+    summary_lines = []
+    for line in lines:
+        if not line:
+            break
+        summary_lines.append(line)
+    summary = " ".join(summary_lines)
+    parameters = {}
+    in_parameters = False
+    for line in lines:
+        if line == "Parameters:":
+            in_parameters = True
+        elif in_parameters:
+            match = _PARAMETER_LINE.match(line)
+            if not match:
+                break
+            parameters[match.group(1)] = match.group(2)
+    return summary, parameters
+
+
+def function_schema(func: Callable) -> Dict[str, Any]:
+    """
+    Build the chat-completions function schema for func from its signature
+    and docstring.
+    """
+    summary, descriptions = _parse_docstring(func.__doc__)
+    hints = typing.get_type_hints(func)
+    properties = {}
+    required = []
+    for name, parameter in inspect.signature(func).parameters.items():
+        properties[name] = {"type": _json_type(hints.get(name, str))}
+        if name in descriptions:
+            properties[name]["description"] = descriptions[name]
+        if parameter.default is inspect.Parameter.empty:
+            required.append(name)
+    return {
+        "name": func.__name__,
+        "description": summary,
+        "parameters": {"type": "object", "properties": properties, "required": required},
+    }
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+class FunctionSet:
+    """
+    An immutable set of function schemas with their JSON encoding cached.
+    """
+
+    def __init__(self, schemas: List[Dict[str, Any]]):
+        self.schemas = schemas
+        self.names = tuple(schema["name"] for schema in schemas)
+        # Everything after the prompt is fixed for a given set
+        self._suffix = b'}],"functions":' + _dumps(schemas) + b',"function_call":"auto"}'
+        self._subsets: Dict[str, "FunctionSet"] = {}
+
+    @classmethod
+    def from_callables(cls, funcs: Iterable[Callable]) -> "FunctionSet":
+        return cls([function_schema(func) for func in funcs])
+
+    def __len__(self) -> int:
+        return len(self.schemas)
+
+    def only(self, name: str) -> "FunctionSet":
+        """
+        Return the set containing just the named function (cached).
+        """
+        if name not in self._subsets:
+            if name not in self.names:
+                raise KeyError(name)
+            self._subsets[name] = FunctionSet([self.schemas[self.names.index(name)]])
+        return self._subsets[name]
+
+    def encode_payload(self, prompt: str, model: str) -> bytes:
+        """
+        Return the JSON request body asking model to pick one of these
+        functions for prompt.
+        """
+        return b"".join((
+            b'{"model":', _dumps(model),
+            b',"messages":[{"role":"user","content":', _dumps(prompt),
+            self._suffix,
+        ))
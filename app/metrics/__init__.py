@@ -0,0 +1,222 @@
+# app/metrics/__init__.py
+
+"""
+Module: metrics
+
+Dependency-free counters and latency histograms rendered in the Prometheus
+text exposition format, plus an ASGI middleware that times every request.
+
+Recording is a dictionary lookup and a few integer updates, so it is cheap
+enough for the hot path. Values that already exist elsewhere (such as cache
+hit counts) are registered as callbacks and only read when /metrics is
+scraped.
+"""
+
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond math to slow upstream calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """
+    A monotonically increasing count per label combination.
+    """
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: "Histogram", labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Histogram:
+    """
+    Observations counted into fixed buckets per label combination.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def time(self, *labels: str) -> _Timer:
+        """
+        Context manager observing the duration of its block.
+        """
+        return _Timer(self, labels)
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> Iterable[str]:
+        bounds = [repr(float(bound)) for bound in self.buckets] + ["+Inf"]
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            series_labels = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{series_labels} {_format_value(total)}"
+            yield f"{self.name}_count{series_labels} {cumulative}"
+
+
+class CallbackMetric:
+    """
+    A counter or gauge whose value is read from `fn` at scrape time.
+    """
+
+    def __init__(self, name: str, help: str, fn: Callable[[], float], type: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.type = type
+
+    def samples(self) -> Iterable[str]:
+        yield f"{self.name} {_format_value(self.fn())}"
+
+
+class MetricsRegistry:
+    """
+    Holds the app's metrics and renders them for /metrics.
+    """
+
+    def __init__(self):
+        self._metrics: List = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def callback(self, name: str, help: str, fn: Callable[[], float], type: str = "gauge") -> CallbackMetric:
+        return self._register(CallbackMetric(name, help, fn, type))
+
+    def _register(self, metric):
+        if any(existing.name == metric.name for existing in self._metrics):
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        Return every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the duration and status of every HTTP request,
+    labelled with the matched route template (e.g. /add), not the raw path.
+
+    The request start time is stored as request.state.request_start so that
+    handlers can time the stages that ran before them (body parsing and
+    validation).
+    """
+
+    def __init__(self, app, requests: Counter, duration: Histogram):
+        self.app = app
+        self.requests = requests
+        self.duration = duration
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        scope.setdefault("state", {})["request_start"] = start
+        status = [500]  # Reported if the app raises before responding
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            self.duration.observe(time.perf_counter() - start, scope["method"], path)
+            self.requests.inc(scope["method"], path, str(status[0]))
+
+
+def request_start(request) -> Optional[float]:
+    """
+    Return the perf_counter() time MetricsMiddleware saw the request arrive.
+    """
+    return getattr(request.state, "request_start", None)
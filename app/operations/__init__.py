@@ -5,11 +5,28 @@ Module: operations.py
 
 """
 
+import math
+import sys
 from typing import Union  # Import Union for type hinting multiple possible types
 
 # Define a type alias for numbers that can be either int or float
 Number = Union[int, float]
 
+# Results with more bits than this overflow a float
+FLOAT_MAX_BITS = sys.float_info.max_exp
+
+# Why power() refuses a result: it is served and stored as a float
+POWER_LIMIT_MESSAGE = (
+    f"Power result would exceed the float range ({FLOAT_MAX_BITS} bits); use power_mod for modular powers."
+)
+
+
+class CostLimitError(ValueError):
+    """
+    Raised instead of starting a computation whose estimated cost is over
+    its limit.
+    """
+
 def add(a: Number, b: Number) -> Number:
     """
     Add two numbers and return the result.
@@ -119,47 +136,118 @@ def gen_division_prompt(a: Number, b: Number) -> str:
 
 def power(a: Number, b: Number) -> Number:
     """
-    Multiply two numbers and return the product.
+    Raise the first number to the power of the second and return the result.
 
     Parameters:
-    - a (int or float): The first number to multiply.
-    - b (int or float): The second number to multiply.
+    - a (int or float): The base number.
+    - b (int or float): The exponent.
 
     Returns:
-    - int or float: The product of a and b.
+    - int or float: a raised to the power of b.
 
     Example:
-    >>> multiply(2, 3)
-    6
-    >>> multiply(2.5, 4)
-    10.0
+    >>> power(2, 3)
+    8
+    >>> power(2.5, 2)
+    6.25
     """
-    # Perform multiplication of a and b
+    # Refuse results that cannot be a float before spending time on them
+    if power_cost(a, b) > FLOAT_MAX_BITS:
+        raise CostLimitError(POWER_LIMIT_MESSAGE)
+    # Raise a to the power of b
     result = a ** b
     return result
 def gen_power_prompt(a:Number, b: Number) -> str:
     return f"Power of {a} by {b}"
 
+def power_cost(a: Number, b: Number) -> int:
+    """
+    Estimate the size in bits of a ** b, which is what computing it costs.
+
+    Only an integer raised to a positive integer power grows with its
+    operands; with a float operand it is a constant-time float operation
+    (that may overflow), estimated as 0.
+
+    Example:
+    >>> power_cost(2, 10)
+    10
+    >>> power_cost(2.0, 10**9)
+    0
+    """
+    if not (isinstance(a, int) and isinstance(b, int)) or b <= 0 or abs(a) <= 1:
+        return 0
+    try:
+        return math.ceil(b * math.log2(abs(a)))
+    except OverflowError:
+        return b  # The exponent alone is beyond float range
+
+def _whole_number(value: Number) -> int:
+    """
+    Return value as an int, accepting floats with no fractional part.
+    """
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    raise ValueError("power_mod requires whole numbers.")
+
+def power_mod(a: Number, b: Number, m: Number) -> int:
+    """
+    Raise the first number to the power of the second, modulo the third,
+    without computing the full power first.
+
+    Parameters:
+    - a (int or float): The base number.
+    - b (int or float): The exponent.
+    - m (int or float): The modulus.
+
+    Returns:
+    - int: a raised to the power of b, modulo m.
+
+    Raises:
+    - ValueError: If an operand is not a whole number, if m is zero, or if b
+      is negative and a has no inverse modulo m.
+
+    Example:
+    >>> power_mod(4, 13, 497)
+    445
+    >>> power_mod(2, 10**18, 1000)
+    376
+    >>> power_mod(5, 3, 0)
+    Traceback (most recent call last):
+        ...
+    ValueError: Cannot divide by zero!
+    """
+    a, b, m = _whole_number(a), _whole_number(b), _whole_number(m)
+    # Check if the modulus is zero to prevent division by zero
+    if m == 0:
+        raise ValueError("Cannot divide by zero!")
+    # Square-and-multiply keeps every intermediate value below m
+    result = pow(a, b, m)
+    return result
+def gen_power_mod_prompt(a: Number, b: Number, m: Number) -> str:
+    return f"Power of {a} by {b} modulo {m}"
+
 def modulus(a: Number, b: Number) -> float:
     """
-    Divide the first number by the second and return the quotient.
+    Compute the remainder of dividing the first number by the second.
 
     Parameters:
     - a (int or float): The dividend.
     - b (int or float): The divisor.
 
     Returns:
-    - float: The quotient of a divided by b.
+    - int or float: The remainder of a divided by b.
 
     Raises:
-    - ValueError: If b is zero, as division by zero is undefined.
+    - ValueError: If b is zero, as the modulus by zero is undefined.
 
     Example:
-    >>> divide(6, 3)
-    2.0
-    >>> divide(5.5, 2)
-    2.75
-    >>> divide(5, 0)
+    >>> modulus(7, 3)
+    1
+    >>> modulus(5.5, 2)
+    1.5
+    >>> modulus(5, 0)
     Traceback (most recent call last):
         ...
     ValueError: Cannot divide by zero!
@@ -169,7 +257,7 @@ def modulus(a: Number, b: Number) -> float:
         # Raise a ValueError with a descriptive message
         raise ValueError("Cannot divide by zero!")
     
-    # Perform division of a by b and return the result as a float
+    # Compute the remainder of a divided by b
     result = a % b
     return result
 def gen_modulus_prompt(a:Number,b:Number) -> str:
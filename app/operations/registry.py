@@ -0,0 +1,113 @@
+# app/operations/registry.py
+
+"""
+Module: registry
+
+The table of calculator operations. Each entry ties an operation function to
+its LLM prompt generator, the Calculation subclass it is stored as and its
+validation rules. main.py generates the routes, the /batch dispatch table and
+the LLM function schema from OPERATIONS, and stored results dispatch through
+the Calculation subclass itself, so adding an operation is one entry plus the
+subclass it is stored as.
+"""
+
+import inspect
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple, Type
+
+from app.calculation import (
+    Addition,
+    Calculation,
+    Division,
+    Modulus,
+    Multiplication,
+    Power,
+    PowerMod,
+    Subtraction,
+)
+from app.operations import (
+    FLOAT_MAX_BITS,
+    CostLimitError,
+    POWER_LIMIT_MESSAGE,
+    add,
+    divide,
+    gen_add_prompt,
+    gen_division_prompt,
+    gen_modulus_prompt,
+    gen_multiply_prompt,
+    gen_power_mod_prompt,
+    gen_power_prompt,
+    gen_substraction_prompt,
+    modulus,
+    multiply,
+    power,
+    power_cost,
+    power_mod,
+    subtract,
+)
+
+
+@dataclass(frozen=True)
+class OperationSpec:
+    """
+    One calculator operation. `name` is the route path, the /batch operation
+    name and the LLM function name.
+    """
+    name: str
+    func: Callable
+    gen_prompt: Callable[..., str]
+    calculation_class: Type[Calculation]
+    description: str
+    # Reject a zero last operand before computing (or asking the LLM)
+    nonzero_divisor: bool = False
+    # Estimated cost of a call, for operations whose running time grows with
+    # their operands; calls over max_cost are refused with cost_limit_message
+    cost: Optional[Callable[..., int]] = None
+    max_cost: Optional[int] = None
+    cost_limit_message: str = "Calculation is too expensive to compute."
+    parameters: Tuple[str, ...] = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "parameters", tuple(inspect.signature(self.func).parameters))
+
+    def check_cost(self, *operands) -> None:
+        """
+        Raise CostLimitError if calling func with operands would cost more
+        than max_cost, before any of the work is done.
+        """
+        if self.cost is not None and self.max_cost is not None and self.cost(*operands) > self.max_cost:
+            raise CostLimitError(self.cost_limit_message)
+
+    @property
+    def arity(self) -> int:
+        return len(self.parameters)
+
+    @property
+    def calculation_type(self) -> str:
+        """
+        The polymorphic identity the operation is saved under, e.g. 'addition'.
+        """
+        return self.calculation_class.__mapper__.polymorphic_identity
+
+
+OPERATIONS: Dict[str, OperationSpec] = {
+    spec.name: spec
+    for spec in (
+        OperationSpec("add", add, gen_add_prompt, Addition, "Add two numbers."),
+        OperationSpec("subtract", subtract, gen_substraction_prompt, Subtraction, "Subtract two numbers."),
+        OperationSpec("multiply", multiply, gen_multiply_prompt, Multiplication, "Multiply two numbers."),
+        OperationSpec("divide", divide, gen_division_prompt, Division, "Divide two numbers.",
+                      nonzero_divisor=True),
+        OperationSpec("modulus", modulus, gen_modulus_prompt, Modulus, "Compute the modulus of two numbers.",
+                      nonzero_divisor=True),
+        OperationSpec("power", power, gen_power_prompt, Power,
+                      "Raise the first number to the power of the second number.",
+                      # Results are returned as floats, so a larger power
+                      # could never be served
+                      cost=power_cost, max_cost=FLOAT_MAX_BITS,
+                      cost_limit_message=POWER_LIMIT_MESSAGE),
+        OperationSpec("power_mod", power_mod, gen_power_mod_prompt, PowerMod,
+                      "Raise the first number to the power of the second, modulo the third.",
+                      nonzero_divisor=True),
+    )
+}
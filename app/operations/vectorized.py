@@ -0,0 +1,125 @@
+# app/operations/vectorized.py
+
+"""
+Module: vectorized.py
+
+Elementwise counterparts of the scalar functions in app.operations. Each
+function accepts array-likes (lists, array.array, memoryviews or other buffers,
+NumPy arrays, or scalars, with NumPy broadcasting) and computes the whole
+result in one call.
+
+Inputs are converted to float64 so integer inputs cannot silently overflow.
+Instead of raising ValueError on a zero divisor, divide_array and
+modulus_array return a boolean mask marking the affected elements, whose
+values are set to NaN.
+"""
+
+from typing import Any, Tuple
+
+import numpy as np
+
+# Anything np.asarray accepts: sequences, buffers, NumPy arrays, scalars
+ArrayLike = Any
+
+
+def _as_float_array(values: ArrayLike) -> np.ndarray:
+    """
+    Convert an array-like to a float64 NumPy array without copying when the
+    input already is one.
+    """
+    return np.asarray(values, dtype=np.float64)
+
+
+def add_array(a: ArrayLike, b: ArrayLike) -> np.ndarray:
+    """
+    Add two arrays elementwise.
+
+    Example:
+    >>> add_array([1, 2], [3, 4])
+    array([4., 6.])
+    """
+    return np.add(_as_float_array(a), _as_float_array(b))
+
+
+def subtract_array(a: ArrayLike, b: ArrayLike) -> np.ndarray:
+    """
+    Subtract the second array from the first elementwise.
+
+    Example:
+    >>> subtract_array([5, 5], [3, 1])
+    array([2., 4.])
+    """
+    return np.subtract(_as_float_array(a), _as_float_array(b))
+
+
+def multiply_array(a: ArrayLike, b: ArrayLike) -> np.ndarray:
+    """
+    Multiply two arrays elementwise.
+
+    Example:
+    >>> multiply_array([2, 3], [4, 5])
+    array([ 8., 15.])
+    """
+    return np.multiply(_as_float_array(a), _as_float_array(b))
+
+
+def divide_array(a: ArrayLike, b: ArrayLike) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Divide the first array by the second elementwise.
+
+    Returns:
+    - (result, zero_mask): zero_mask is True where the divisor is zero; the
+      corresponding result elements are NaN.
+
+    Example:
+    >>> result, zero_mask = divide_array([6, 5], [3, 0])
+    >>> result
+    array([ 2., nan])
+    >>> zero_mask
+    array([False,  True])
+    """
+    a, b = np.broadcast_arrays(_as_float_array(a), _as_float_array(b))
+    zero_mask = b == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = np.divide(a, b)
+    # np.where rather than item assignment, which 0-d results do not support
+    return np.where(zero_mask, np.nan, result), zero_mask
+
+
+def power_array(a: ArrayLike, b: ArrayLike) -> np.ndarray:
+    """
+    Raise the first array to the power of the second elementwise.
+
+    Unlike power(), a negative base with a fractional exponent gives NaN rather
+    than a complex number, and overflow gives inf rather than OverflowError.
+
+    Example:
+    >>> power_array([2, 3], [3, 2])
+    array([8., 9.])
+    """
+    with np.errstate(over="ignore", invalid="ignore"):
+        return np.power(_as_float_array(a), _as_float_array(b))
+
+
+def modulus_array(a: ArrayLike, b: ArrayLike) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the modulus of two arrays elementwise, with the sign of the
+    divisor like Python's % operator.
+
+    Returns:
+    - (result, zero_mask): zero_mask is True where the divisor is zero; the
+      corresponding result elements are NaN.
+
+    Example:
+    >>> result, zero_mask = modulus_array([10, -7, 4], [3, 3, 0])
+    >>> result
+    array([ 1.,  2., nan])
+    >>> zero_mask
+    array([False, False,  True])
+    """
+    a, b = np.broadcast_arrays(_as_float_array(a), _as_float_array(b))
+    zero_mask = b == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = np.mod(a, b)
+    # np.where rather than item assignment, which 0-d results do not support
+    return np.where(zero_mask, np.nan, result), zero_mask
@@ -0,0 +1,233 @@
+# app/resilience/__init__.py
+
+"""
+Module: resilience
+
+Protection for calls to the upstream LLM API: bounded retries with
+exponential backoff on 429/5xx and transport errors, a circuit breaker that
+fails fast while the upstream is unhealthy, and a bulkhead capping the number
+of concurrent upstream calls.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: rate limiting and server-side failures
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class ResilienceError(Exception):
+    """
+    Base class for calls rejected without reaching the upstream.
+    """
+
+
+class CircuitOpenError(ResilienceError):
+    """
+    Raised while the circuit breaker is open.
+    """
+
+
+class BulkheadFullError(ResilienceError):
+    """
+    Raised when no concurrency slot frees up in time.
+    """
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Whether an upstream error is transient: a timeout or connection failure,
+    or a 429/5xx response.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """
+    Return the Retry-After delay in seconds sent with a 429/503, if any.
+    """
+    if not isinstance(error, httpx.HTTPStatusError):
+        return None
+    try:
+        return max(0.0, float(error.response.headers["Retry-After"]))
+    except (KeyError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds. It then lets a single probe call through: success
+    closes the circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def before_call(self) -> None:
+        """
+        Raise CircuitOpenError unless a call may go ahead.
+        """
+        state = self.state
+        if state == self.OPEN or (state == self.HALF_OPEN and self._probing):
+            raise CircuitOpenError("Upstream circuit is open.")
+        if state == self.HALF_OPEN:
+            self._probing = True
+
+    def record_success(self) -> None:
+        self._state = self.CLOSED
+        self._failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                logger.warning("Upstream circuit opened after %d failures.", self._failures)
+            self._state = self.OPEN
+            self._opened_at = self._clock()
+            self._probing = False
+
+    def abandon_probe(self) -> None:
+        """
+        Let another probe through after one was cancelled without a result.
+        """
+        self._probing = False
+
+
+class Bulkhead:
+    """
+    Caps concurrent calls at `max_concurrent`. A caller waits at most
+    `timeout` seconds for a slot before BulkheadFullError is raised.
+    """
+
+    def __init__(self, max_concurrent: int, timeout: float = 1.0):
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop; tests run several in turn
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    async def __aenter__(self) -> "Bulkhead":
+        semaphore = self._get_semaphore()
+        if semaphore.locked() and self.timeout <= 0:
+            raise BulkheadFullError("Too many concurrent upstream calls.")
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            raise BulkheadFullError("Too many concurrent upstream calls.")
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._semaphore.release()
+
+
+class ResilientCaller:
+    """
+    Runs upstream calls through the circuit breaker and bulkhead, retrying
+    transient failures up to `attempts` times in total with exponential
+    backoff and jitter (or the server's Retry-After, capped at max_delay).
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        bulkhead: Bulkhead,
+        attempts: int = 3,
+        base_delay: float = 0.1,
+        max_delay: float = 2.0,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ):
+        self.breaker = breaker
+        self.bulkhead = bulkhead
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+        self.retries = 0  # Attempts after the first, across all calls
+        self.rejected = 0  # Calls refused by the breaker or bulkhead
+
+    def backoff(self, attempt: int, error: BaseException) -> float:
+        """
+        Seconds to wait after failed attempt number `attempt` (1-based).
+        """
+        delay = retry_after(error)
+        if delay is None:
+            delay = self.base_delay * 2 ** (attempt - 1) * random.uniform(0.5, 1.0)
+        return min(delay, self.max_delay)
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return await fn(), retrying transient errors.
+
+        Raises:
+        - CircuitOpenError / BulkheadFullError: If the call was not attempted.
+        - httpx.HTTPError: The last error, once retries are exhausted or for
+          errors that are not transient.
+        """
+        try:
+            self.breaker.before_call()
+            async with self.bulkhead:
+                for attempt in range(1, self.attempts + 1):
+                    if attempt > 1:
+                        self.breaker.before_call()
+                        self.retries += 1
+                    try:
+                        result = await fn()
+                    except Exception as e:
+                        if not is_retryable(e):
+                            # The upstream answered; it is not unhealthy
+                            self.breaker.record_success()
+                            raise
+                        self.breaker.record_failure()
+                        if attempt == self.attempts:
+                            raise
+                        delay = self.backoff(attempt, e)
+                        logger.warning(f"Upstream call failed ({e}); retrying in {delay:.2f}s.")
+                        await self._sleep(delay)
+                    except BaseException:
+                        self.breaker.abandon_probe()
+                        raise
+                    else:
+                        self.breaker.record_success()
+                        return result
+        except ResilienceError:
+            self.rejected += 1
+            raise
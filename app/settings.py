@@ -1,6 +1,7 @@
 # app/settings.py
 
 import os
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict, Field
 
@@ -25,3 +26,57 @@ class TestSettings(Settings):
         env_file_encoding="utf-8",
         extra="forbid"  # Disallow extra fields
     )
+
+
+class AppSettings(BaseSettings):
+    """
+    Runtime settings for the calculator API. Every field has a default so the
+    app can start without a .env file.
+    """
+    api_endpoint: str = "https://api.groq.com/openai/v1/chat/completions"
+    api_key: Optional[str] = Field(None, alias="API_KEY")
+    llm_model: str = "llama3-8b-8192"
+    llm_connect_timeout: float = 5.0  # Seconds to establish a connection
+    llm_read_timeout: float = 30.0  # Seconds to wait for the upstream response
+    llm_pool_timeout: float = 5.0  # Seconds to wait for a free pooled connection
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_cache_size: int = 1024  # Max cached function calls; 0 disables the cache
+    llm_cache_ttl: float = 300.0  # Seconds a cached function call stays valid
+    # Send only the route's own function schema instead of all of them, which
+    # shrinks each upstream request and its prompt token count
+    llm_single_function: bool = False
+    # Upstream resilience: total attempts per call (retrying 429/5xx and
+    # transport errors), backoff bounds, circuit breaker and concurrency cap
+    llm_retry_attempts: int = 3
+    llm_retry_base_delay: float = 0.1  # Seconds before the first retry
+    llm_retry_max_delay: float = 2.0  # Cap on any single backoff delay
+    llm_breaker_failure_threshold: int = 5  # Consecutive failures that open the circuit
+    llm_breaker_reset_timeout: float = 30.0  # Seconds the circuit stays open
+    llm_max_concurrency: int = 50  # Concurrent upstream calls per worker
+    llm_bulkhead_timeout: float = 1.0  # Seconds to wait for a free slot
+    # Compute with the request's own operands when the upstream call fails,
+    # instead of answering 400
+    llm_fallback_to_local: bool = False
+    # "local" computes with app.operations directly; "llm" resolves the
+    # operands through the function-calling API first. Overridable per request
+    # with the X-Execution-Mode header.
+    execution_mode: Literal["local", "llm"] = "local"
+    metrics_enabled: bool = True  # Time requests and expose /metrics
+    batch_max_items: int = 100_000  # Largest batch accepted by /batch
+    batch_stream_threshold: int = 1_000  # Batches larger than this are streamed
+    expression_cache_size: int = 1024  # Compiled /evaluate expressions kept; 0 disables
+    # Database for persisting calculations. Defaults to the db_* settings;
+    # sync URLs (postgresql://, sqlite://) are switched to async drivers.
+    database_url: Optional[str] = None
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0  # Seconds to wait for a pooled connection
+    db_pool_recycle: int = 1800  # Seconds before a pooled connection is replaced
+    db_create_tables: bool = False  # Run metadata.create_all on startup
+
+    model_config = ConfigDict(
+        env_file=os.path.join(os.path.dirname(__file__), "../.env"),
+        env_file_encoding="utf-8",
+        extra="ignore"  # The shared .env also carries the database settings
+    )
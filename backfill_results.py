@@ -0,0 +1,71 @@
+"""
+Fill calculations.result for rows written before the column existed (or
+through Core statements that skip the ORM hooks), in batches with one commit
+per batch, so it is safe to run while the app is serving. The schema is
+upgraded first (see app.calculation.upgrade_schema), which adds the column
+to a table created before it existed.
+
+Pass --rebuild-stats on the first run against such a database, since its
+calculation_stats rollup is created empty.
+
+Usage:
+    python backfill_results.py
+    python backfill_results.py --batch-size 5000 --rebuild-stats
+    python backfill_results.py --database-url sqlite:///calculator.db
+"""
+
+import argparse
+import asyncio
+
+from dotenv import load_dotenv
+
+from app.calculation import backfill_results, rebuild_calculation_stats, upgrade_schema
+from app.database import Database, database_url_from_settings
+from app.settings import AppSettings
+
+
+def parse_arguments(argv=None):
+    """
+    Parses command-line arguments.
+    """
+    parser = argparse.ArgumentParser(description='Backfill stored calculation results.')
+    parser.add_argument('-b', '--batch-size', type=int, default=1000,
+                        help='Rows updated per batch and commit (default: 1000)')
+    parser.add_argument('--rebuild-stats', action='store_true',
+                        help='Also recompute the calculation_stats rollup from scratch')
+    parser.add_argument('--database-url', help='Database to update (default: from settings)')
+    return parser.parse_args(argv)
+
+
+async def backfill(args) -> int:
+    """
+    Upgrade the schema and run the backfill on the app's async engine, and
+    return the number of rows updated. Both are written against sync
+    connections, so they run through run_sync.
+    """
+    database = Database(args.database_url or AppSettings().database_url or database_url_from_settings())
+    await database.startup()
+    if not database.is_started:
+        raise SystemExit("No database configured; set database_url or the db_* settings.")
+    try:
+        async with database.engine.begin() as connection:
+            for change in await connection.run_sync(upgrade_schema):
+                print(f"{change}.")
+        async with database.session() as session:
+            updated = await session.run_sync(backfill_results, args.batch_size)
+            if args.rebuild_stats:
+                await session.run_sync(rebuild_calculation_stats)
+    finally:
+        await database.shutdown()
+    return updated
+
+
+def main(argv=None):
+    load_dotenv()
+    args = parse_arguments(argv)
+    updated = asyncio.run(backfill(args))
+    print(f"Backfilled {updated} calculation results.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Export a user's calculation history as NDJSON, CSV or an Arrow IPC stream,
+streaming rows from a server-side cursor so memory stays flat.
+
+Usage:
+    python export_calculations.py USER_ID --format csv --output history.csv
+    python export_calculations.py USER_ID --format arrow --type addition --type power > history.arrow
+"""
+
+import argparse
+import asyncio
+import sys
+import uuid
+
+from dotenv import load_dotenv
+
+from app.database import Database, database_url_from_settings
+from app.export import EXPORT_BATCH_SIZE, EXPORT_FORMATS, export_calculations, export_encoder, select_export
+from app.settings import AppSettings
+
+
+def parse_arguments():
+    """
+    Parses command-line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Export a user's calculations.")
+    parser.add_argument('user_id', type=uuid.UUID, help='User whose calculations are exported')
+    parser.add_argument('-f', '--format', choices=list(EXPORT_FORMATS), default='ndjson',
+                        help='Output format (default: ndjson)')
+    parser.add_argument('-o', '--output', default='-', help='Output file (default: stdout)')
+    parser.add_argument('-t', '--type', action='append', dest='types',
+                        help='Only export this calculation type; repeatable')
+    parser.add_argument('-b', '--batch-size', type=int, default=EXPORT_BATCH_SIZE,
+                        help=f'Rows fetched per batch (default: {EXPORT_BATCH_SIZE})')
+    parser.add_argument('--database-url', help='Database to read from (default: from settings)')
+    return parser.parse_args()
+
+
+async def export(args) -> None:
+    database = Database(args.database_url or AppSettings().database_url or database_url_from_settings())
+    await database.startup()
+    if not database.is_started:
+        raise SystemExit("No database configured; set database_url or the db_* settings.")
+    statement = select_export(args.user_id, args.types, args.batch_size)
+    encoder = export_encoder(args.format)
+    output = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+    try:
+        async with database.session() as session:
+            async for chunk in export_calculations(session, statement, encoder):
+                output.write(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+        await database.shutdown()
+
+
+def main():
+    load_dotenv()
+    args = parse_arguments()
+    try:
+        asyncio.run(export(args))
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,141 +1,275 @@
 # main.py
 
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel, Field, validator  # Use @validator for Pydantic 1.x
 from fastapi.exceptions import RequestValidationError
-from app.operations import *  # Ensure correct import path
+from app.operations import CostLimitError
+from app.operations.registry import OPERATIONS, OperationSpec
+from app.llm import FunctionSet, LLMClient, MalformedResponseError
+from app.cache import ResultCache, SingleFlight
+from app.expressions import MAX_EXPRESSION_LENGTH, PlanCache
+from app.resilience import Bulkhead, CircuitBreaker, ResilienceError, ResilientCaller
+from app.settings import AppSettings
+from app.database import Database, database_url_from_settings
+from app.calculation import Calculation, select_calculation_page, select_calculation_stats, split_page
+from app.export import EXPORT_FORMATS, export_calculations, export_encoder, select_export
+from app.metrics import CONTENT_TYPE, MetricsMiddleware, MetricsRegistry, request_start
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
 import uvicorn
 import logging
-import requests
+import httpx
 import json
+from datetime import datetime
+import math
+import time
+import uuid
 from dotenv import load_dotenv
-import os
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Runtime settings (API endpoint, API key, timeouts, pool sizes)
+settings = AppSettings()
+
 # API Endpoint and API Key
-API_ENDPOINT = "https://api.groq.com/openai/v1/chat/completions"
-API_KEY = os.getenv("API_KEY")
+API_ENDPOINT = settings.api_endpoint
+API_KEY = settings.api_key
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+# Shared async client for the upstream LLM; one connection pool per worker
+llm_client = LLMClient(
+    endpoint=API_ENDPOINT,
+    api_key=API_KEY,
+    connect_timeout=settings.llm_connect_timeout,
+    read_timeout=settings.llm_read_timeout,
+    pool_timeout=settings.llm_pool_timeout,
+    max_connections=settings.llm_max_connections,
+    max_keepalive_connections=settings.llm_max_keepalive_connections,
+)
+
+# Cache of resolved function calls, keyed on prompt and model
+llm_cache = ResultCache(maxsize=settings.llm_cache_size, ttl=settings.llm_cache_ttl)
+
+# Identical prompts in flight at the same time share one upstream request
+llm_flight = SingleFlight()
+
+# Retries, circuit breaker and concurrency cap around upstream calls
+llm_resilience = ResilientCaller(
+    breaker=CircuitBreaker(
+        failure_threshold=settings.llm_breaker_failure_threshold,
+        reset_timeout=settings.llm_breaker_reset_timeout,
+    ),
+    bulkhead=Bulkhead(settings.llm_max_concurrency, timeout=settings.llm_bulkhead_timeout),
+    attempts=settings.llm_retry_attempts,
+    base_delay=settings.llm_retry_base_delay,
+    max_delay=settings.llm_retry_max_delay,
+)
+
+# Compiled /evaluate expressions, keyed on their text
+expression_plans = PlanCache(maxsize=settings.expression_cache_size)
+
+# Async database for persisting calculations; disabled when not configured
+database = Database(
+    settings.database_url or database_url_from_settings(),
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    create_tables=settings.db_create_tables,
+)
+
+# Request, stage, upstream and cache metrics, exposed at /metrics
+metrics = MetricsRegistry()
+HTTP_REQUESTS = metrics.counter(
+    "http_requests_total", "HTTP requests by route and response status.", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route")
+)
+STAGE_DURATION = metrics.histogram(
+    "calculator_stage_duration_seconds",
+    "Time spent per request stage: validation, llm, compute and db.",
+    ("route", "stage"),
+)
+LLM_UPSTREAM_REQUESTS = metrics.counter(
+    "llm_upstream_requests_total", "Requests sent to the LLM API by outcome.", ("outcome",)
+)
+LLM_UPSTREAM_DURATION = metrics.histogram(
+    "llm_upstream_request_duration_seconds", "Latency of requests sent to the LLM API."
+)
+metrics.callback("llm_cache_hits_total", "LLM function calls served from the cache.",
+                 lambda: llm_cache.hits, "counter")
+metrics.callback("llm_cache_misses_total", "LLM function calls not found in the cache.",
+                 lambda: llm_cache.misses, "counter")
+metrics.callback("llm_cache_entries", "LLM function calls currently cached.", lambda: len(llm_cache))
+metrics.callback("llm_upstream_retries_total", "Upstream LLM calls retried after a transient failure.",
+                 lambda: llm_resilience.retries, "counter")
+metrics.callback("llm_upstream_rejected_total", "LLM calls refused by the circuit breaker or bulkhead.",
+                 lambda: llm_resilience.rejected, "counter")
+metrics.callback("llm_circuit_open", "1 while the upstream circuit breaker is open, else 0.",
+                 lambda: int(llm_resilience.breaker.state == CircuitBreaker.OPEN))
+metrics.callback("llm_singleflight_coalesced_total", "LLM calls that joined an identical in-flight call.",
+                 lambda: llm_flight.coalesced, "counter")
+metrics.callback("expression_plan_cache_hits_total", "/evaluate expressions served from the plan cache.",
+                 lambda: expression_plans.hits, "counter")
+metrics.callback("expression_plan_cache_misses_total", "/evaluate expressions compiled on a cache miss.",
+                 lambda: expression_plans.misses, "counter")
+COMPUTE_REFUSED = metrics.counter("compute_refused_total", "Calculations refused as too expensive.")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Open the upstream and database connection pools on startup and close them
+    on shutdown.
+    """
+    await llm_client.startup()
+    await database.startup()
+    yield
+    await database.shutdown()
+    await llm_client.shutdown()
+
+app = FastAPI(lifespan=lifespan)
+
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware, requests=HTTP_REQUESTS, duration=HTTP_REQUEST_DURATION)
 
 # Setup templates directory
 templates = Jinja2Templates(directory="templates")
 
-def call_groq_function(prompt, model="llama3-8b-8192"):
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Content-Type": "application/json",
-    }
-
-    payload = {
-        "model": model,
-        "messages": [{"role": "user", "content": prompt}],
-        "functions": [ 
-            {
-                "name": "add",
-                "description": "Add two numbers.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "a": {"type": "number", "description": "The first number."},
-                        "b": {"type": "number", "description": "The second number."}
-                    },
-                    "required": ["a", "b"]
-                },
-            },
-            {
-                "name": "subtract",
-                "description": "Subtract two numbers.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "a": {"type": "number", "description": "The first number."},
-                        "b": {"type": "number", "description": "The second number."}
-                    },
-                    "required": ["a", "b"]
-                },
-            },
-            {
-                "name": "multiply",
-                "description": "Multiply two numbers.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "a": {"type": "number", "description": "The first number."},
-                        "b": {"type": "number", "description": "The second number."}
-                    },
-                    "required": ["a", "b"]
-                },
-            },
-            {
-                "name": "divide",
-                "description": "Divide two numbers.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "a": {"type": "number", "description": "The first number."},
-                        "b": {"type": "number", "description": "The second number."}
-                    },
-                    "required": ["a", "b"]
-                },
-            },
-            {
-                "name": "power",
-                "description": "Raise the first number to the power of the second number.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "a": {"type": "number", "description": "The base number."},
-                        "b": {"type": "number", "description": "The exponent."}
-                    },
-                    "required": ["a", "b"]
-                },
-            },
-            {
-                "name": "modulus",
-                "description": "Compute the modulus of two numbers.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "a": {"type": "number", "description": "The dividend."},
-                        "b": {"type": "number", "description": "The divisor."}
-                    },
-                    "required": ["a", "b"]
-                },
-            }
-        ],
-        "function_call": "auto",
-    }
+# Functions the model may call, in the chat-completions function-calling
+# schema. Generated from the registered operations' signatures and docstrings
+# and JSON-encoded once at import.
+LLM_FUNCTIONS = FunctionSet.from_callables(spec.func for spec in OPERATIONS.values())
 
-    try:
-        response = requests.post(API_ENDPOINT, headers=headers, json=payload)
-        response.raise_for_status()
-        data = response.json()
+async def call_groq_function(prompt, model=None, function_name=None):
+    """
+    Ask the model which function to call for the prompt, without blocking the
+    event loop. Returns (function_name, arguments) or (None, None) on failure.
+    Transient upstream errors are retried, and calls fail fast while the
+    circuit breaker is open or too many calls are in flight.
+    Successful calls are cached, so repeated prompts skip the upstream request,
+    and concurrent identical prompts share a single upstream request. When
+    llm_single_function is set and function_name is given, only that
+    function's schema is sent.
+    """
+    model = model or settings.llm_model
+    functions = LLM_FUNCTIONS
+    if function_name and settings.llm_single_function:
+        functions = LLM_FUNCTIONS.only(function_name)
+    cache_key = ResultCache.make_key(prompt, model)
+    cached = await llm_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
-        # Check if the model called a function
-        if "function_call" in data["choices"][0]["message"]:
-            function_name = data["choices"][0]["message"]["function_call"]["name"]
-            arguments = json.loads(data["choices"][0]["message"]["function_call"]["arguments"])
-            return function_name, arguments
+    async def attempt():
+        start = time.perf_counter()
+        try:
+            called, args = await llm_client.call_function(prompt, functions, model)
+        except httpx.HTTPError:
+            LLM_UPSTREAM_REQUESTS.inc("error")
+            raise
+        except MalformedResponseError:
+            LLM_UPSTREAM_REQUESTS.inc("malformed")
+            raise
+        finally:
+            LLM_UPSTREAM_DURATION.observe(time.perf_counter() - start)
+        LLM_UPSTREAM_REQUESTS.inc("ok")
+        return called, args
 
-        return None, None
+    async def fetch():
+        called, args = await llm_resilience.call(attempt)
+        if called and args:
+            await llm_cache.set(cache_key, (called, args))
+        return called, args
 
-    except requests.exceptions.RequestException as e:
+    try:
+        return await llm_flight.do(cache_key, fetch)
+    except (httpx.HTTPError, ResilienceError, MalformedResponseError) as e:
         logger.error(f"An error occurred: {e}")
         return None, None
 
+# Supported values for AppSettings.execution_mode and the X-Execution-Mode header
+EXECUTION_MODES = ("local", "llm")
+
+def get_execution_mode(x_execution_mode: Optional[str] = Header(None)) -> str:
+    """
+    Resolve the execution mode for a request: the X-Execution-Mode header if
+    present, otherwise the app-wide setting.
+    """
+    mode = (x_execution_mode or settings.execution_mode).lower()
+    if mode not in EXECUTION_MODES:
+        raise HTTPException(status_code=400, detail=f"Unsupported execution mode: {mode}")
+    return mode
+
+def request_operands(operation, spec: OperationSpec) -> tuple:
+    """
+    Return the request's values for the spec's parameters, in order. Raises
+    ValueError if the operation needs a value the request left out.
+    """
+    operands = tuple(getattr(operation, parameter, None) for parameter in spec.parameters)
+    missing = [parameter for parameter, value in zip(spec.parameters, operands) if value is None]
+    if missing:
+        raise ValueError(f"{spec.name} requires {', '.join(missing)}.")
+    return operands
+
+async def resolve_operands(operands: tuple, spec: OperationSpec, mode: str):
+    """
+    Return the operands to compute with. In "local" mode these are the
+    validated request values; in "llm" mode the model is asked for them via
+    the spec's prompt, offering it the spec's function schema alone when
+    llm_single_function is set. Returns None if the external call failed or
+    the model's arguments are not numbers, unless llm_fallback_to_local is set.
+    """
+    if mode == "local":
+        return operands
+    prompt = spec.gen_prompt(*operands)
+    function_name, args = await call_groq_function(prompt, function_name=spec.name)
+    if function_name and args:
+        resolved = tuple(args.get(parameter) for parameter in spec.parameters)
+        if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in resolved):
+            return resolved
+        logger.error(f"{spec.name}: model returned non-numeric arguments {args!r}.")
+    if settings.llm_fallback_to_local:
+        logger.warning(f"{spec.name}: upstream call failed, computing locally.")
+        return operands
+    return None
+
+async def get_db_session():
+    """
+    Yield the request's AsyncSession, or None if the database is disabled.
+    """
+    async for session in database.get_session():
+        yield session
+
+async def save_calculation(session: Optional[AsyncSession], user_id, calculation_type: str, operands) -> None:
+    """
+    Persist an operation as a Calculation row when the request names a user.
+    """
+    if user_id is None:
+        return
+    if session is None:
+        raise ValueError("Saving calculations is not configured.")
+    session.add(Calculation.create(calculation_type, user_id, list(operands)))
+    try:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise ValueError(f"Unknown user: {user_id}")
+
 # Pydantic model for request data
 class OperationRequest(BaseModel):
     a: float = Field(..., description="The first number")
     b: float = Field(..., description="The second number")
+    m: Optional[float] = Field(None, description="The modulus, for power_mod")
+    user_id: Optional[uuid.UUID] = Field(None, description="Save the calculation for this user")
 
     @validator('a', 'b')  # Correct decorator for Pydantic 1.x
     def validate_numbers(cls, value):
@@ -151,6 +285,60 @@ class OperationResponse(BaseModel):
 class ErrorResponse(BaseModel):
     error: str = Field(..., description="Error message")
 
+# Pydantic model for one item of a batch request
+class BatchItem(BaseModel):
+    operation: str = Field(..., description="Operation name, e.g. add or divide")
+    a: float = Field(..., description="The first number")
+    b: float = Field(..., description="The second number")
+    m: Optional[float] = Field(None, description="The modulus, for power_mod")
+
+# Pydantic model for the outcome of one batch item
+class BatchItemResult(BaseModel):
+    result: Optional[float] = Field(None, description="The result, if the item succeeded")
+    error: Optional[str] = Field(None, description="Error message, if the item failed")
+
+# Pydantic model for a batch response
+class BatchResponse(BaseModel):
+    results: List[BatchItemResult] = Field(..., description="Per-item outcomes, in request order")
+
+# Pydantic model for an /evaluate request
+class EvaluateRequest(BaseModel):
+    expression: str = Field(..., max_length=MAX_EXPRESSION_LENGTH,
+                            description="Arithmetic expression, e.g. (a + b) * c % d or power_mod(a, b, 97)")
+    variables: Dict[str, float] = Field(default_factory=dict, description="Values for the expression's variables")
+
+# Pydantic model for one saved calculation in a user's history
+class CalculationItem(BaseModel):
+    id: uuid.UUID
+    type: str = Field(..., description="Calculation type, e.g. addition")
+    inputs: List[Any] = Field(..., description="The calculation's operands")
+    result: Optional[float] = Field(None, description="The stored result, if computable")
+    created_at: datetime
+
+# Pydantic model for one page of a user's history
+class CalculationPage(BaseModel):
+    items: List[CalculationItem] = Field(..., description="Calculations, newest first")
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to get the next page; null on the last page")
+
+# Pydantic model for a user's rollup of one calculation type
+class CalculationTypeStats(BaseModel):
+    type: str = Field(..., description="Calculation type, e.g. addition")
+    count: int = Field(..., description="Number of calculations of this type")
+    result_count: int = Field(..., description="Of which have a stored result")
+    result_sum: Optional[float] = Field(None, description="Sum of the stored results")
+    result_min: Optional[float] = Field(None, description="Smallest stored result")
+    result_max: Optional[float] = Field(None, description="Largest stored result")
+    result_mean: Optional[float] = Field(None, description="Mean of the stored results")
+    last_created_at: Optional[datetime] = Field(None, description="When the latest calculation was saved")
+    last_calculation_id: Optional[uuid.UUID] = Field(None, description="The latest calculation")
+
+# Pydantic model for a user's calculation statistics
+class UserStats(BaseModel):
+    user_id: uuid.UUID
+    count: int = Field(..., description="Total number of saved calculations")
+    last_created_at: Optional[datetime] = Field(None, description="When the latest calculation was saved")
+    types: List[CalculationTypeStats] = Field(..., description="Per-type statistics, by type name")
+
 # Custom Exception Handlers
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
@@ -170,6 +358,14 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={"error": error_messages},
     )
 
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_route():
+        """
+        Expose the app's metrics in the Prometheus text format.
+        """
+        return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
+
 @app.get("/")
 async def read_root(request: Request):
     """
@@ -177,123 +373,226 @@ async def read_root(request: Request):
     """
     return templates.TemplateResponse("index.html", {"request": request})
 
-@app.post("/add", response_model=OperationResponse, responses={400: {"model": ErrorResponse}})
-async def add_route(operation: OperationRequest):
+def make_operation_route(spec: OperationSpec):
     """
-    Add two numbers.
+    Build the POST handler for one registry entry. The spec is bound once
+    here, so a request does no registry lookups.
     """
-    try:
-        logger.debug(f"Request Payload: a={operation.a}, b={operation.b}")
-        prompt = gen_add_prompt(operation.a, operation.b)
-        function_name, args = call_groq_function(prompt)
-        if function_name and args:
-            result = add(args["a"], args["b"])
-        else:
-            logger.error("Add Operation Error: Failed to call external API.")
-            raise HTTPException(status_code=400, detail="Failed to call external API for addition.")
+    api_error = f"Failed to call external API for {spec.calculation_type}."
+    route = f"/{spec.name}"
+
+    async def operation_route(
+        request: Request,
+        operation: OperationRequest,
+        mode: str = Depends(get_execution_mode),
+        session: Optional[AsyncSession] = Depends(get_db_session),
+    ):
+        started = request_start(request)
+        if started is not None:
+            # Body parsing, validation and dependencies, since the middleware
+            STAGE_DURATION.observe(time.perf_counter() - started, route, "validation")
+        try:
+            operands = request_operands(operation, spec)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if spec.nonzero_divisor and operands[-1] == 0:
+            raise HTTPException(status_code=400, detail="Cannot divide by zero!")
+        if mode != "local":
+            with STAGE_DURATION.time(route, "llm"):
+                operands = await resolve_operands(operands, spec, mode)
+        if not operands:
+            logger.error(f"{spec.name} operation error: Failed to call external API.")
+            raise HTTPException(status_code=400, detail=api_error)
+        try:
+            with STAGE_DURATION.time(route, "compute"):
+                # Model-supplied operands may be ints of any size, so costly
+                # calls are refused before any work is done
+                try:
+                    spec.check_cost(*operands)
+                except CostLimitError:
+                    COMPUTE_REFUSED.inc()
+                    raise
+                result = spec.func(*operands)
+            if isinstance(result, complex) or not math.isfinite(result):
+                raise ValueError("Result is not a finite real number.")
+            if operation.user_id is not None:
+                with STAGE_DURATION.time(route, "db"):
+                    await save_calculation(session, operation.user_id, spec.calculation_type, operands)
+        except (ValueError, ArithmeticError) as e:
+            logger.error(f"{spec.name} operation error: {e}")
+            raise HTTPException(status_code=400, detail=str(e))
         return OperationResponse(result=result)
-    except Exception as e:
-        logger.error(f"Add Operation Error: {str(e)}")
-        raise HTTPException(status_code=400, detail=str(e))
 
-@app.post("/subtract", response_model=OperationResponse, responses={400: {"model": ErrorResponse}})
-async def subtract_route(operation: OperationRequest):
+    operation_route.__name__ = f"{spec.name}_route"
+    return operation_route
+
+# One route per registered operation, e.g. POST /add
+for spec in OPERATIONS.values():
+    app.post(
+        f"/{spec.name}",
+        response_model=OperationResponse,
+        responses={400: {"model": ErrorResponse}},
+        description=spec.description,
+    )(make_operation_route(spec))
+
+# Operations available to /batch, by name
+BATCH_OPERATIONS = {name: spec.func for name, spec in OPERATIONS.items()}
+
+# Number of batch results serialized per streamed chunk
+BATCH_CHUNK_SIZE = 500
+
+def evaluate_batch_item(item: BatchItem) -> dict:
     """
-    Subtract two numbers.
+    Evaluate one batch item locally. Failures are reported on the item
+    instead of failing the whole batch.
     """
+    name = item.operation.lower()
+    func = BATCH_OPERATIONS.get(name)
+    if func is None:
+        return {"result": None, "error": f"Unsupported operation: {item.operation}"}
     try:
-        prompt = gen_substraction_prompt(operation.a, operation.b)
-        function_name, args = call_groq_function(prompt)
-        if function_name and args:
-            result = subtract(args["a"], args["b"])
-        else:
-            logger.error("Subtract Operation Error: Failed to call external API.")
-            raise HTTPException(status_code=400, detail="Failed to call external API for subtraction.")
-        return OperationResponse(result=result)
-    except Exception as e:
-        logger.error(f"Subtract Operation Error: {str(e)}")
-        raise HTTPException(status_code=400, detail=str(e))
+        # Batch operands are floats, so every operation is constant-time
+        result = func(*request_operands(item, OPERATIONS[name]))
+    except (ValueError, ArithmeticError) as e:
+        return {"result": None, "error": str(e)}
+    if isinstance(result, complex) or not math.isfinite(result):
+        return {"result": None, "error": "Result is not a finite real number."}
+    return {"result": result, "error": None}
 
-@app.post("/multiply", response_model=OperationResponse, responses={400: {"model": ErrorResponse}})
-async def multiply_route(operation: OperationRequest):
+def stream_batch_results(items: List[BatchItem]):
     """
-    Multiply two numbers.
+    Yield the JSON body of a BatchResponse chunk by chunk.
     """
-    try:
-        prompt = gen_multiply_prompt(operation.a, operation.b)
-        function_name, args = call_groq_function(prompt)
-        if function_name and args:
-            result = multiply(args["a"], args["b"])
-        else:
-            logger.error("Multiply Operation Error: Failed to call external API.")
-            raise HTTPException(status_code=400, detail="Failed to call external API for multiplication.")
-        return OperationResponse(result=result)
-    except Exception as e:
-        logger.error(f"Multiply Operation Error: {str(e)}")
-        raise HTTPException(status_code=400, detail=str(e))
+    yield b'{"results":['
+    for start in range(0, len(items), BATCH_CHUNK_SIZE):
+        chunk = [evaluate_batch_item(item) for item in items[start:start + BATCH_CHUNK_SIZE]]
+        body = json.dumps(chunk, separators=(",", ":"))[1:-1]
+        yield (b"," if start else b"") + body.encode()
+    yield b"]}"
+
+@app.post("/batch", response_model=BatchResponse, responses={400: {"model": ErrorResponse}})
+async def batch_route(items: List[BatchItem]):
+    """
+    Evaluate many operations in one request. Large batches are streamed.
+    """
+    if len(items) > settings.batch_max_items:
+        raise HTTPException(status_code=400, detail=f"Batch exceeds the limit of {settings.batch_max_items} items.")
+    if len(items) > settings.batch_stream_threshold:
+        # The generator is iterated in a worker thread, off the event loop
+        return StreamingResponse(stream_batch_results(items), media_type="application/json")
+    return JSONResponse(content={"results": [evaluate_batch_item(item) for item in items]})
 
-@app.post("/divide", response_model=OperationResponse, responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
-async def divide_route(operation: OperationRequest):
+@app.post("/evaluate", response_model=OperationResponse, responses={400: {"model": ErrorResponse}})
+async def evaluate_route(request: Request, body: EvaluateRequest):
     """
-    Divide two numbers.
+    Evaluate a whole formula over the registered operations in one call.
+    Compiled expressions are cached by text, so a repeated formula skips
+    parsing. Evaluation runs inline with every step bounded (see
+    Plan.evaluate).
     """
-    if operation.b == 0:
-        raise HTTPException(status_code=400, detail="Cannot divide by zero!")  # Correct error message.
+    started = request_start(request)
+    if started is not None:
+        STAGE_DURATION.observe(time.perf_counter() - started, "/evaluate", "validation")
     try:
-        prompt = gen_division_prompt(operation.a, operation.b)
-        function_name, args = call_groq_function(prompt)
-        if function_name and args:
-            result = divide(args["a"], args["b"])
-        else:
-            logger.error("Failed to call external API for division.")
-            raise HTTPException(status_code=400, detail="Failed to call external API for division.")
-        return OperationResponse(result=result)
-    except ValueError as e:
-        logger.error(f"Divide Operation Error: {str(e)}")
+        with STAGE_DURATION.time("/evaluate", "compute"):
+            plan = expression_plans.get(body.expression)
+            result = plan.evaluate(body.variables)
+        if isinstance(result, complex) or not math.isfinite(result):
+            raise ValueError("Result is not a finite real number.")
+    except (ValueError, ArithmeticError) as e:
+        logger.error(f"evaluate error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error(f"Divide Operation Internal Error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal Server Error")
+    return OperationResponse(result=result)
 
+# Largest page served by the history endpoint
+HISTORY_MAX_LIMIT = 500
 
-@app.post("/modulus", response_model=OperationResponse, responses={400: {"model": ErrorResponse}})
-async def modulus_route(operation: OperationRequest):
+@app.get("/users/{user_id}/calculations", response_model=CalculationPage, responses={400: {"model": ErrorResponse}})
+async def calculation_history_route(
+    user_id: uuid.UUID,
+    limit: int = Query(50, ge=1, le=HISTORY_MAX_LIMIT, description="Calculations per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    type: Optional[List[str]] = Query(None, description="Only these calculation types; repeatable"),
+    session: Optional[AsyncSession] = Depends(get_db_session),
+):
     """
-    Compute the modulus of two numbers.
+    List a user's saved calculations, newest first, with keyset pagination.
     """
+    if session is None:
+        raise HTTPException(status_code=503, detail="Calculation history is not configured.")
     try:
-        prompt = gen_modulus_prompt(operation.a, operation.b)
-        function_name, args = call_groq_function(prompt)
-        if function_name and args:
-            result = modulus(args["a"], args["b"])
-        else:
-            logger.error("Modulus Operation Error: Failed to call external API.")
-            raise HTTPException(status_code=400, detail="Failed to call external API for modulus.")
-        return OperationResponse(result=result)
+        statement = select_calculation_page(user_id, limit, cursor, type)
     except ValueError as e:
-        logger.error(f"Modulus Operation Error: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error(f"Modulus Operation Internal Error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal Server Error")
+    rows = (await session.execute(statement)).all()
+    page, next_cursor = split_page(rows, limit)
+    return CalculationPage(
+        items=[CalculationItem(**row._mapping) for row in page],
+        next_cursor=next_cursor,
+    )
 
-@app.post("/power", response_model=OperationResponse, responses={400: {"model": ErrorResponse}})
-async def power_route(operation: OperationRequest):
+@app.get("/users/{user_id}/stats", response_model=UserStats)
+async def user_stats_route(user_id: uuid.UUID, session: Optional[AsyncSession] = Depends(get_db_session)):
     """
-    Raise the first number to the power of the second number.
+    Summarize a user's saved calculations per type, read from the
+    incrementally maintained calculation_stats rollup.
     """
+    if session is None:
+        raise HTTPException(status_code=503, detail="Calculation history is not configured.")
+    rows = (await session.execute(select_calculation_stats(user_id))).scalars().all()
+    types = [
+        CalculationTypeStats(
+            type=row.type,
+            count=row.count,
+            result_count=row.result_count,
+            result_sum=row.result_sum,
+            result_min=row.result_min,
+            result_max=row.result_max,
+            result_mean=row.result_sum / row.result_count if row.result_count else None,
+            last_created_at=row.last_created_at,
+            last_calculation_id=row.last_calculation_id,
+        )
+        for row in rows
+    ]
+    last = [row.last_created_at for row in rows if row.last_created_at is not None]
+    return UserStats(
+        user_id=user_id,
+        count=sum(row.count for row in rows),
+        last_created_at=max(last) if last else None,
+        types=types,
+    )
+
+@app.get("/users/{user_id}/calculations/export", responses={400: {"model": ErrorResponse}})
+async def export_calculations_route(
+    user_id: uuid.UUID,
+    format: str = Query("ndjson", description=f"One of: {', '.join(EXPORT_FORMATS)}"),
+    type: Optional[List[str]] = Query(None, description="Only these calculation types; repeatable"),
+):
+    """
+    Stream all of a user's saved calculations, oldest first, as NDJSON, CSV
+    or an Arrow IPC stream.
+    """
+    if not database.is_started:
+        raise HTTPException(status_code=503, detail="Calculation history is not configured.")
     try:
-        prompt = gen_power_prompt(operation.a, operation.b)
-        function_name, args = call_groq_function(prompt)
-        if function_name and args:
-            result = power(args["a"], args["b"])
-        else:
-            logger.error("Power Operation Error: Failed to call external API.")
-            raise HTTPException(status_code=400, detail="Failed to call external API for power operation.")
-        return OperationResponse(result=result)
-    except Exception as e:
-        logger.error(f"Power Operation Error: {str(e)}")
+        statement = select_export(user_id, type)
+        encoder = export_encoder(format)
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+    async def stream():
+        # The request's session is closed once the handler returns, so the
+        # stream opens its own
+        async with database.session() as session:
+            async for chunk in export_calculations(session, statement, encoder):
+                yield chunk
+
+    filename = f"calculations-{user_id}.{encoder.extension}"
+    return StreamingResponse(
+        stream(),
+        media_type=encoder.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
 if __name__ == "__main__":
     uvicorn.run(app, host="127.0.0.1", port=8000)
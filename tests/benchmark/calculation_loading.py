@@ -0,0 +1,115 @@
+# tests/benchmark/calculation_loading.py
+
+"""
+Compare query time and peak Python memory of the Calculation loading
+strategies for one user's history.
+
+Usage:
+    python -m tests.benchmark.calculation_loading --rows 100000
+    python -m tests.benchmark.calculation_loading --database-url postgresql://...
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.calculation import (
+    Base,
+    Calculation,
+    User,
+    compute_result,
+    load_user_with_calculations,
+    select_calculation_columns,
+    select_calculations,
+)
+
+CALCULATION_TYPES = ['addition', 'subtraction', 'multiplication', 'division', 'power', 'modulus']
+
+
+def seed(session, rows: int) -> uuid.UUID:
+    """Insert one user with `rows` calculations and return the user id."""
+    user = User(
+        first_name="Bench",
+        last_name="Mark",
+        email=f"bench-{uuid.uuid4().hex}@example.com",
+        username=f"bench-{uuid.uuid4().hex[:20]}",
+        password="hashed_password",
+    )
+    session.add(user)
+    session.commit()
+
+    start = datetime.utcnow()
+    batch = []
+    for i in range(rows):
+        calculation_type = CALCULATION_TYPES[i % len(CALCULATION_TYPES)]
+        inputs = [random.randint(1, 100), random.randint(1, 10)]
+        batch.append({
+            "id": uuid.uuid4(),
+            "user_id": user.id,
+            "type": calculation_type,
+            "inputs": inputs,
+            "result": float(compute_result(calculation_type, inputs)),
+            "created_at": start + timedelta(microseconds=i),
+            "updated_at": start,
+        })
+        if len(batch) == 10_000:
+            session.execute(insert(Calculation.__table__), batch)
+            batch = []
+    if batch:
+        session.execute(insert(Calculation.__table__), batch)
+    session.commit()
+    return user.id
+
+
+def strategies(user_id: uuid.UUID) -> dict:
+    """Return name -> callable(session) returning the number of loaded rows."""
+    return {
+        "orm, all subclasses": lambda s: len(s.execute(select_calculations(user_id)).scalars().all()),
+        "orm, addition only": lambda s: len(s.execute(select_calculations(user_id, ['addition'])).scalars().all()),
+        "columns": lambda s: len(s.execute(select_calculation_columns(user_id=user_id)).all()),
+        "ids only": lambda s: len(s.execute(select_calculation_columns('id', user_id=user_id)).all()),
+        "user + selectinload": lambda s: len(load_user_with_calculations(s, user_id).calculations),
+    }
+
+
+def measure(Session, func):
+    """Run func in a fresh session and return (rows, seconds, peak MiB)."""
+    with Session() as session:
+        tracemalloc.start()
+        start = time.perf_counter()
+        rows = func(session)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return rows, elapsed, peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Calculation loading strategies.')
+    parser.add_argument('--rows', type=int, default=100_000, help='Calculations to seed (default: 100000)')
+    parser.add_argument('--database-url', default='sqlite:///:memory:', help='Database to benchmark against')
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url, echo=False)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    with Session() as session:
+        user_id = seed(session, args.rows)
+
+    print(f"{'strategy':<22} {'rows':>8} {'seconds':>9} {'peak MiB':>9}")
+    for name, func in strategies(user_id).items():
+        rows, elapsed, peak = measure(Session, func)
+        print(f"{name:<22} {rows:>8} {elapsed:>9.3f} {peak:>9.1f}")
+
+    engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+# tests/benchmark/loadgen.py
+
+"""
+HTTP load generator for the calculator endpoints. Serves the app with uvicorn
+on a local port, with the upstream chat-completions API replaced by an
+in-process mock, then drives /add ... /power with concurrent clients and
+reports latency percentiles and throughput.
+
+Exits with status 1 if a threshold is exceeded, so CI can fail on
+regressions.
+
+Usage:
+    python -m tests.benchmark.loadgen --requests 5000 --concurrency 50
+    python -m tests.benchmark.loadgen --mode llm --upstream-latency-ms 20
+    python -m tests.benchmark.loadgen --max-p99-ms 50 --min-rps 500 --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import re
+import socket
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+import httpx
+import uvicorn
+
+import main
+from app.llm import LLMClient
+from app.operations.registry import OPERATIONS
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?(?:e[-+]?\d+)?")
+
+
+def mock_upstream(latency: float) -> httpx.MockTransport:
+    """
+    Chat-completions stand-in that answers each prompt with a function call
+    for the operation it names, after `latency` seconds.
+    """
+    async def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        prompt = payload["messages"][0]["content"]
+        functions = {function["name"]: function for function in payload["functions"]}
+        if len(functions) == 1:
+            name = next(iter(functions))
+        else:
+            name = "power_mod" if " modulo " in prompt else prompt.split()[0].lower()
+        parameters = functions[name]["parameters"]["properties"]
+        arguments = dict(zip(parameters, (float(n) for n in _NUMBER.findall(prompt))))
+        if latency:
+            await asyncio.sleep(latency)
+        message = {"function_call": {"name": name, "arguments": json.dumps(arguments)}}
+        return httpx.Response(200, json={"choices": [{"message": message}]})
+
+    return httpx.MockTransport(handler)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int) -> uvicorn.Server:
+    """Run the app with uvicorn in a background thread and wait until it is up."""
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise RuntimeError("Server did not start.")
+        time.sleep(0.05)
+    return server
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, round(p / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def run_load(base_url: str, total: int, concurrency: int, mode: str, seed: int) -> Dict:
+    """
+    Send `total` requests spread over every operation route from
+    `concurrency` workers and return the summary statistics.
+    """
+    rng = random.Random(seed)
+    routes = list(OPERATIONS)
+
+    def body(route):
+        if route == "power_mod":  # Whole numbers only
+            return {"a": rng.randint(2, 10**6), "b": rng.randint(2, 10**6), "m": rng.randint(2, 10**6)}
+        return {"a": round(rng.uniform(1, 100), 3), "b": round(rng.uniform(1, 10), 3)}
+
+    jobs = [(f"/{route}", body(route)) for route in (rng.choice(routes) for _ in range(total))]
+    latencies: List[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, headers={"X-Execution-Mode": mode}) as client:
+        async def worker(worker_jobs):
+            nonlocal errors
+            for path, body in worker_jobs:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(path, json=body)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append(time.perf_counter() - start)
+                errors += not ok
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(jobs[i::concurrency]) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": errors / total if total else 0.0,
+        "seconds": elapsed,
+        "rps": total / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def check_thresholds(stats: Dict, max_p99_ms: Optional[float], min_rps: Optional[float],
+                     max_error_rate: float) -> List[str]:
+    """Return a message for every threshold the run violated."""
+    failures = []
+    if max_p99_ms is not None and stats["p99_ms"] > max_p99_ms:
+        failures.append(f"p99 {stats['p99_ms']:.1f} ms exceeds {max_p99_ms} ms")
+    if min_rps is not None and stats["rps"] < min_rps:
+        failures.append(f"{stats['rps']:.0f} requests/sec is below {min_rps}")
+    if stats["error_rate"] > max_error_rate:
+        failures.append(f"error rate {stats['error_rate']:.2%} exceeds {max_error_rate:.2%}")
+    return failures
+
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Load-test the calculator endpoints.')
+    parser.add_argument('--requests', type=int, default=2000, help='Total requests (default: 2000)')
+    parser.add_argument('--concurrency', type=int, default=20, help='Concurrent clients (default: 20)')
+    parser.add_argument('--mode', choices=['local', 'llm'], default='local',
+                        help='X-Execution-Mode sent with each request (default: local)')
+    parser.add_argument('--upstream-latency-ms', type=float, default=0.0,
+                        help='Latency of the mock chat-completions API in llm mode (default: 0)')
+    parser.add_argument('--warmup', type=int, default=100, help='Untimed requests sent first (default: 100)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for operands (default: 0)')
+    parser.add_argument('--max-p99-ms', type=float, help='Fail if p99 latency exceeds this')
+    parser.add_argument('--min-rps', type=float, help='Fail if throughput is below this')
+    parser.add_argument('--max-error-rate', type=float, default=0.0, help='Fail above this error rate (default: 0)')
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args(argv)
+
+    # Per-request client logging would be measured along with the app
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    # Route llm mode to the mock upstream; operands are random, so the
+    # result cache does not hide the upstream cost
+    main.llm_client = LLMClient(
+        endpoint="http://mock-upstream/v1/chat/completions",
+        api_key="loadgen",
+        max_connections=max(args.concurrency, 1),
+        transport=mock_upstream(args.upstream_latency_ms / 1000),
+    )
+
+    server = start_server(free_port())
+    base_url = f"http://127.0.0.1:{server.config.port}"
+    try:
+        if args.warmup:
+            asyncio.run(run_load(base_url, args.warmup, args.concurrency, args.mode, args.seed + 1))
+        stats = asyncio.run(run_load(base_url, args.requests, args.concurrency, args.mode, args.seed))
+    finally:
+        server.should_exit = True
+
+    print(f"{'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    print(f"{stats['requests']:>9} {stats['errors']:>7} {stats['rps']:>9.0f} "
+          f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"mode": args.mode, "concurrency": args.concurrency, **stats}, f, indent=2)
+
+    failures = check_thresholds(stats, args.max_p99_ms, args.min_rps, args.max_error_rate)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
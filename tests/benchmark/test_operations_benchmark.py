@@ -0,0 +1,59 @@
+# tests/benchmark/test_operations_benchmark.py
+
+"""
+pytest-benchmark microbenchmarks for app.operations and
+Calculation.get_result.
+
+Usage:
+    pytest tests/benchmark --benchmark-only
+    # Save a baseline, then fail if a test's fastest run takes twice as long
+    # (reruns on one machine vary by up to 2x in the mean and median):
+    pytest tests/benchmark --benchmark-only --benchmark-autosave
+    pytest tests/benchmark --benchmark-only --benchmark-compare --benchmark-compare-fail=min:99%
+"""
+
+import random
+import uuid
+
+import pytest
+
+from app.calculation import Calculation, compute_results
+from app.operations.registry import OPERATIONS
+
+USER_ID = uuid.uuid4()
+
+
+@pytest.mark.parametrize("name", list(OPERATIONS))
+def test_operation(benchmark, name):
+    """Benchmark one scalar operation."""
+    spec = OPERATIONS[name]
+    args = (7.5, 2) if spec.arity == 2 else (7, 2**64, 1000003)
+    assert benchmark(spec.func, *args) == spec.func(*args)
+
+
+# power, modulus and power_mod take exactly their arity in inputs; the
+# others take any number
+GET_RESULT_CASES = [(name, spec.arity) for name, spec in OPERATIONS.items()] + [
+    (name, 1000) for name in ("add", "subtract", "multiply", "divide")
+]
+
+
+@pytest.mark.parametrize("name,size", GET_RESULT_CASES)
+def test_get_result(benchmark, name, size):
+    """Benchmark Calculation.get_result on short and long input lists."""
+    rng = random.Random(size)
+    if name == "power_mod":  # Whole numbers only
+        inputs = [rng.randint(2, 10**6) for _ in range(size)]
+    else:
+        inputs = [rng.uniform(1, 2) for _ in range(size)]
+    calculation = Calculation.create(OPERATIONS[name].calculation_type, USER_ID, inputs)
+    benchmark(calculation.get_result)
+
+
+def test_compute_results_bulk(benchmark):
+    """Benchmark evaluating 10,000 stored rows of mixed types."""
+    rng = random.Random(0)
+    types = [spec.calculation_type for spec in OPERATIONS.values() if spec.arity == 2]
+    rows = [(rng.choice(types), [rng.uniform(1, 2), rng.uniform(1, 2)]) for _ in range(10_000)]
+    results = benchmark(compute_results, rows)
+    assert len(results) == len(rows)
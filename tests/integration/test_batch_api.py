@@ -0,0 +1,85 @@
+# tests/integration/test_batch_api.py
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from main import app
+
+
+@pytest.fixture
+def client():
+    """Create a TestClient for the FastAPI application."""
+    with TestClient(app) as client:
+        yield client
+
+
+def test_batch_mixed_operations(client):
+    """Test that a batch of mixed operations returns results in order."""
+    items = [
+        {"operation": "add", "a": 1, "b": 2},
+        {"operation": "subtract", "a": 10, "b": 4},
+        {"operation": "multiply", "a": 3, "b": 5},
+        {"operation": "divide", "a": 9, "b": 3},
+        {"operation": "modulus", "a": 10, "b": 3},
+        {"operation": "power", "a": 2, "b": 8},
+    ]
+    response = client.post("/batch", json=items)
+    assert response.status_code == 200
+    assert [r["result"] for r in response.json()["results"]] == [3, 6, 15, 3, 1, 256]
+
+
+def test_batch_reports_per_item_errors(client):
+    """Test that failing items carry an error without failing the batch."""
+    items = [
+        {"operation": "divide", "a": 1, "b": 0},
+        {"operation": "modulus", "a": 1, "b": 0},
+        {"operation": "sqrt", "a": 4, "b": 0},
+        {"operation": "add", "a": 1, "b": 1},
+    ]
+    response = client.post("/batch", json=items)
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {"result": None, "error": "Cannot divide by zero!"},
+        {"result": None, "error": "Cannot divide by zero!"},
+        {"result": None, "error": "Unsupported operation: sqrt"},
+        {"result": 2, "error": None},
+    ]
+
+
+def test_batch_non_finite_result(client):
+    """Test that overflowing or complex results are reported as errors."""
+    items = [
+        {"operation": "power", "a": 10, "b": 400},
+        {"operation": "power", "a": -8, "b": 0.5},
+    ]
+    response = client.post("/batch", json=items)
+    assert response.status_code == 200
+    assert all(r["result"] is None and r["error"] for r in response.json()["results"])
+
+
+def test_batch_large_batches_are_streamed(client, monkeypatch):
+    """Test that batches above the threshold stream the same JSON body."""
+    monkeypatch.setattr(main.settings, "batch_stream_threshold", 10)
+    monkeypatch.setattr(main, "BATCH_CHUNK_SIZE", 7)
+    items = [{"operation": "add", "a": i, "b": 1} for i in range(25)]
+    response = client.post("/batch", json=items)
+    assert response.status_code == 200
+    assert "content-length" not in response.headers
+    assert [r["result"] for r in response.json()["results"]] == [i + 1 for i in range(25)]
+
+
+def test_batch_limit(client, monkeypatch):
+    """Test that batches above the size limit are rejected."""
+    monkeypatch.setattr(main.settings, "batch_max_items", 2)
+    items = [{"operation": "add", "a": 1, "b": 1}] * 3
+    response = client.post("/batch", json=items)
+    assert response.status_code == 400
+    assert "Batch exceeds the limit of 2 items." in response.json()["error"]
+
+
+def test_batch_validation_error(client):
+    """Test that malformed items are rejected by request validation."""
+    response = client.post("/batch", json=[{"operation": "add", "a": "x", "b": 1}])
+    assert response.status_code == 400
+    assert "error" in response.json()
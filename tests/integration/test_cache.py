@@ -0,0 +1,210 @@
+# tests/integration/test_cache.py
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import main
+from app.cache import CacheBackend, LocalCacheBackend, ResultCache, SingleFlight
+from app.llm import LLMClient
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_hit_and_miss_counters():
+    """Test that hits and misses are counted."""
+    async def run():
+        cache = ResultCache(maxsize=10, ttl=60)
+        assert await cache.get("k") is None
+        await cache.set("k", ("add", {"a": 1, "b": 2}))
+        assert await cache.get("k") == ("add", {"a": 1, "b": 2})
+        return cache
+
+    cache = asyncio.run(run())
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_cache_evicts_least_recently_used():
+    """Test that the cache stays within maxsize by evicting the LRU entry."""
+    async def run():
+        cache = ResultCache(maxsize=2, ttl=60)
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        await cache.get("a")  # "b" is now the least recently used
+        await cache.set("c", 3)
+        return cache, [await cache.get(k) for k in ("a", "b", "c")]
+
+    cache, values = asyncio.run(run())
+    assert len(cache) == 2
+    assert values == [1, None, 3]
+
+
+def test_cache_entries_expire():
+    """Test that entries are not served after their TTL."""
+    clock = FakeClock()
+
+    async def run():
+        cache = ResultCache(maxsize=10, ttl=5, clock=clock)
+        await cache.set("k", 1)
+        clock.now = 4.9
+        fresh = await cache.get("k")
+        clock.now = 5.0
+        return fresh, await cache.get("k")
+
+    assert asyncio.run(run()) == (1, None)
+
+
+def test_cache_disabled_with_zero_size():
+    """Test that maxsize=0 disables caching."""
+    async def run():
+        cache = ResultCache(maxsize=0)
+        await cache.set("k", 1)
+        return await cache.get("k")
+
+    assert asyncio.run(run()) is None
+
+
+def test_cache_reads_through_shared_backend():
+    """Test that a local miss is filled from the shared backend."""
+    backend = LocalCacheBackend()
+
+    async def run():
+        writer = ResultCache(maxsize=10, ttl=60, backend=backend)
+        reader = ResultCache(maxsize=10, ttl=60, backend=backend)
+        await writer.set("k", 1)
+        return reader, await reader.get("k")
+
+    reader, value = asyncio.run(run())
+    assert value == 1
+    assert reader.hits == 1
+    assert len(reader) == 1
+
+
+def test_incomplete_backend_fails_at_construction():
+    """Test that a backend missing set() cannot be instantiated."""
+    class ReadOnlyBackend(CacheBackend):
+        async def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        ReadOnlyBackend()
+
+
+def test_call_groq_function_is_cached(monkeypatch):
+    """Test that a repeated prompt is served without a second upstream request."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        arguments = json.dumps({"a": 2, "b": 10})
+        return httpx.Response(
+            200,
+            json={"choices": [{"message": {"function_call": {"name": "power", "arguments": arguments}}}]},
+        )
+
+    client = LLMClient("https://llm.test/v1/chat/completions", "key", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(main, "llm_client", client)
+    monkeypatch.setattr(main, "llm_cache", ResultCache(maxsize=10, ttl=60))
+
+    async def run():
+        try:
+            first = await main.call_groq_function("Power of 2 by 10")
+            second = await main.call_groq_function("Power of 2 by 10")
+            return first, second
+        finally:
+            await client.shutdown()
+
+    first, second = asyncio.run(run())
+    assert first == second == ("power", {"a": 2, "b": 10})
+    assert len(calls) == 1
+    assert main.llm_cache.hits == 1
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    """Test that concurrent calls with the same key share one execution."""
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def run():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("k", fetch) for _ in range(5)))
+        return flight, results
+
+    flight, results = asyncio.run(run())
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    assert flight.coalesced == 4
+    assert len(flight) == 0
+
+
+def test_single_flight_shares_errors():
+    """Test that every waiter receives the error of the shared call."""
+    async def fetch():
+        await asyncio.sleep(0.05)
+        raise httpx.ConnectError("upstream down")
+
+    async def run():
+        flight = SingleFlight()
+        return await asyncio.gather(*(flight.do("k", fetch) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, httpx.ConnectError) for r in results)
+
+
+def test_single_flight_runs_again_after_completion():
+    """Test that a key is re-executed once its previous call has finished."""
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    async def run():
+        flight = SingleFlight()
+        return await flight.do("k", fetch), await flight.do("k", fetch)
+
+    assert asyncio.run(run()) == (1, 2)
+
+
+def test_call_groq_function_coalesces_identical_prompts(monkeypatch):
+    """Test that a burst of identical prompts makes one upstream request."""
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        arguments = json.dumps({"a": 10, "b": 3})
+        return httpx.Response(
+            200,
+            json={"choices": [{"message": {"function_call": {"name": "modulus", "arguments": arguments}}}]},
+        )
+
+    client = LLMClient("https://llm.test/v1/chat/completions", "key", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(main, "llm_client", client)
+    monkeypatch.setattr(main, "llm_cache", ResultCache(maxsize=0))
+    monkeypatch.setattr(main, "llm_flight", SingleFlight())
+
+    async def run():
+        try:
+            return await asyncio.gather(*(main.call_groq_function("Modulus of 10 by 3") for _ in range(10)))
+        finally:
+            await client.shutdown()
+
+    results = asyncio.run(run())
+    assert results == [("modulus", {"a": 10, "b": 3})] * 10
+    assert len(calls) == 1
@@ -4,19 +4,27 @@ import pytest
 import uuid
 from datetime import datetime
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, update
 from sqlalchemy.orm import sessionmaker, scoped_session
 
 from app.calculation import (
     Base,
     User,
     Calculation,
+    CalculationStats,
     Addition,
     Subtraction,
     Multiplication,
     Division,
     Power,
-    Modulus
+    Modulus,
+    compute_result,
+    compute_results,
+    backfill_results,
+    load_user_with_calculations,
+    rebuild_calculation_stats,
+    select_calculation_columns,
+    select_calculations,
 )
 
 
@@ -267,3 +275,167 @@ def test_user_repr():
     user = User(first_name="Diana", last_name="Evans", email="diana.evans@example.com")
     repr_str = repr(user)
     assert "<User(name=Diana Evans, email=diana.evans@example.com)>" == repr_str
+
+
+def test_addition_compensated_sum(session):
+    """Test that Addition sums floats without accumulating rounding error."""
+    addition = Addition(user_id=uuid.uuid4(), inputs=[0.1] * 10)
+    assert addition.get_result() == 1.0
+
+
+def test_addition_large_integers_are_exact(session):
+    """Test that integer inputs are summed exactly."""
+    addition = Addition(user_id=uuid.uuid4(), inputs=[2 ** 60, 1, -(2 ** 60)])
+    assert addition.get_result() == 1
+
+
+def test_addition_mixed_inputs_use_compensated_sum(session):
+    """Test that one float among integers switches to math.fsum."""
+    addition = Addition(user_id=uuid.uuid4(), inputs=[2 ** 60, 1.0, -(2 ** 60)])
+    assert addition.get_result() == 1.0
+
+
+def test_division_long_inputs_with_underflowing_product(session):
+    """Test Division when the product of the divisors underflows to zero."""
+    division = Division(user_id=uuid.uuid4(), inputs=[1e-300, 1e-200, 1e-200])
+    assert division.get_result() == pytest.approx(1e100)
+
+
+def test_compute_result_matches_get_result(session):
+    """Test that compute_result mirrors each subclass's get_result."""
+    rows = [
+        Addition(user_id=uuid.uuid4(), inputs=[1, 2, 3]),
+        Subtraction(user_id=uuid.uuid4(), inputs=[10, 5, 2]),
+        Multiplication(user_id=uuid.uuid4(), inputs=[2, 3, 4]),
+        Division(user_id=uuid.uuid4(), inputs=[20, 5, 2]),
+        Power(user_id=uuid.uuid4(), inputs=[2, 3]),
+        Modulus(user_id=uuid.uuid4(), inputs=[10, 3]),
+    ]
+    for calc in rows:
+        assert compute_result(calc.type, calc.inputs) == calc.get_result()
+
+
+def test_compute_results_bulk(session):
+    """Test evaluating Calculation instances and (type, inputs) rows in bulk."""
+    rows = [
+        Addition(user_id=uuid.uuid4(), inputs=[1, 2]),
+        ('multiplication', [3, 4]),
+        ('division', [1, 4]),
+    ]
+    assert compute_results(rows) == [3, 12, 0.25]
+
+
+def test_compute_results_errors(session):
+    """Test that bulk evaluation raises or collects errors per row."""
+    rows = [('division', [1, 0]), ('addition', [1, 1]), ('unknown', [1])]
+    with pytest.raises(ValueError) as excinfo:
+        compute_results(rows)
+    assert "Cannot divide by zero." in str(excinfo.value)
+
+    results = compute_results(rows, return_exceptions=True)
+    assert isinstance(results[0], ValueError)
+    assert results[1] == 2
+    assert "Unsupported calculation type: unknown" in str(results[2])
+
+
+def make_user(session, name):
+    """Create and commit a user for stored-result tests."""
+    user = User(
+        first_name=name,
+        last_name="Tester",
+        email=f"{name.lower()}@example.com",
+        username=name.lower(),
+        password="hashed_password"
+    )
+    session.add(user)
+    session.commit()
+    return user
+
+
+def test_result_stored_on_insert(session):
+    """Test that the result column is populated when a calculation is inserted."""
+    user = make_user(session, "Erin")
+    multiplication = Multiplication(user_id=user.id, inputs=[2, 3, 4])
+    division = Division(user_id=user.id, inputs=[1, 0])
+    session.add_all([multiplication, division])
+    session.commit()
+
+    assert session.query(Calculation.result).filter_by(id=multiplication.id).scalar() == 24
+    assert session.query(Calculation.result).filter_by(id=division.id).scalar() is None
+
+
+def test_result_refreshed_when_inputs_change(session):
+    """Test that updating inputs recomputes the stored result."""
+    user = make_user(session, "Frank")
+    addition = Addition(user_id=user.id, inputs=[1, 2])
+    session.add(addition)
+    session.commit()
+
+    addition.inputs = [5, 5]
+    session.commit()
+    assert session.query(Calculation.result).filter_by(id=addition.id).scalar() == 10
+
+
+def test_backfill_results(session):
+    """Test that backfill fills NULL results and skips uncomputable rows."""
+    user = make_user(session, "Grace")
+    rows = [
+        Addition(user_id=user.id, inputs=[1, 2]),
+        Power(user_id=user.id, inputs=[2, 10]),
+        Power(user_id=user.id, inputs=[2, 3]),
+        Modulus(user_id=user.id, inputs=[1, 0]),
+    ]
+    session.add_all(rows)
+    session.commit()
+    table = Calculation.__table__
+    session.execute(update(table).where(table.c.id != rows[2].id).values(result=None))
+    rebuild_calculation_stats(session)
+
+    assert backfill_results(session, batch_size=2) == 2
+    results = {tuple(c.inputs): c.result for c in session.query(Calculation).filter_by(user_id=user.id)}
+    assert results == {(1, 2): 3, (2, 10): 1024, (2, 3): 8, (1, 0): None}
+    stats = session.query(CalculationStats).filter_by(user_id=user.id, type='power').one()
+    assert (stats.count, stats.result_count, stats.result_sum) == (2, 2, 1032)
+    assert (stats.result_min, stats.result_max) == (8, 1024)
+
+
+def test_select_calculations_by_type(session):
+    """Test loading only the requested Calculation subclasses."""
+    user = make_user(session, "Heidi")
+    session.add_all([
+        Addition(user_id=user.id, inputs=[1, 2]),
+        Division(user_id=user.id, inputs=[4, 2]),
+        Power(user_id=user.id, inputs=[2, 2]),
+    ])
+    session.commit()
+
+    loaded = session.execute(select_calculations(user.id, ['addition', 'power'])).scalars().all()
+    assert sorted(type(c).__name__ for c in loaded) == ['Addition', 'Power']
+    assert len(session.execute(select_calculations(user.id)).scalars().all()) == 3
+
+    with pytest.raises(ValueError):
+        select_calculations(user.id, ['unknown'])
+
+
+def test_select_calculation_columns(session):
+    """Test column-only projections of a user's calculations."""
+    user = make_user(session, "Ivan")
+    addition = Addition(user_id=user.id, inputs=[1, 2])
+    session.add_all([addition, Division(user_id=user.id, inputs=[4, 2])])
+    session.commit()
+
+    rows = session.execute(select_calculation_columns('id', 'result', user_id=user.id, types=['addition'])).all()
+    assert [tuple(row) for row in rows] == [(addition.id, 3)]
+
+
+def test_load_user_with_calculations(session):
+    """Test eager loading of User.calculations."""
+    user = make_user(session, "Judy")
+    session.add_all([Addition(user_id=user.id, inputs=[1, 2]), Subtraction(user_id=user.id, inputs=[3, 1])])
+    session.commit()
+    user_id = user.id
+    session.expunge_all()
+
+    loaded = load_user_with_calculations(session, user_id)
+    assert 'calculations' in loaded.__dict__  # Already loaded, no lazy load on access
+    assert len(loaded.calculations) == 2
@@ -0,0 +1,84 @@
+# tests/integration/test_compute.py
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.calculation import Calculation, compute_results, storable_result
+from app.operations import POWER_LIMIT_MESSAGE, CostLimitError, power, power_cost, power_mod
+
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_power_cost_estimates_result_bits():
+    """Test that only integer powers are costed, by the size of their result."""
+    assert power_cost(2, 100) == 100
+    assert power_cost(3, 10**6) == 1584963  # (3 ** 10**6).bit_length()
+    assert power_cost(2.0, 10**9) == power_cost(2, -5) == power_cost(1, 10**9) == 0
+
+
+def test_oversized_powers_are_refused_without_computing():
+    """Test that power, get_result and the stored result refuse huge results quickly."""
+    start = time.perf_counter()
+    for exponent in (10**12, 2_646_000, 647):
+        with pytest.raises(CostLimitError):
+            power(3, exponent)
+        with pytest.raises(CostLimitError):
+            Calculation.create("power", None, [3, exponent]).get_result()
+    assert compute_results([("power", [3, 2_646_000])] * 5, return_exceptions=True)[0].args == (
+        POWER_LIMIT_MESSAGE,
+    )
+    assert power(3, 646) == 3**646
+    assert storable_result("power", [3, 10**6]) is None
+    assert storable_result("power", [2, 10]) == 1024
+    assert time.perf_counter() - start < 0.5
+
+
+def test_power_mod():
+    """Test modular exponentiation and its validation."""
+    assert power_mod(4, 13, 497) == 445
+    assert power_mod(3.0, 10**18, 7) == pow(3, 10**18, 7)
+    assert Calculation.create("power_mod", None, [4, 13, 497]).get_result() == 445
+    for operands in [(2.5, 2, 7), (2, 2, 0)]:
+        with pytest.raises(ValueError):
+            power_mod(*operands)
+
+
+def test_power_mod_route(client):
+    """Test /power_mod, including its required third operand."""
+    assert client.post("/power_mod", json={"a": 4, "b": 13, "m": 497}).json()["result"] == 445
+    missing = client.post("/power_mod", json={"a": 4, "b": 13})
+    assert missing.status_code == 400
+    assert missing.json()["error"] == "power_mod requires m."
+    assert client.post("/power_mod", json={"a": 4, "b": 13, "m": 0}).status_code == 400
+
+
+def test_power_beyond_float_range_is_refused_up_front(client, monkeypatch):
+    """Test that a power whose result cannot be a float is refused and counted."""
+    async def big_power(prompt, model=None, function_name=None):
+        return "power", {"a": 3, "b": 2_000_000}
+
+    monkeypatch.setattr(main, "call_groq_function", big_power)
+    refused = main.COMPUTE_REFUSED.value()
+    response = client.post("/power", json={"a": 3, "b": 2}, headers={"X-Execution-Mode": "llm"})
+    assert response.status_code == 400
+    assert response.json()["error"] == POWER_LIMIT_MESSAGE
+    assert main.COMPUTE_REFUSED.value() == refused + 1
+
+
+def test_llm_supplied_huge_exponent_is_rejected(client, monkeypatch):
+    """Test that an integer power from the model cannot stall the event loop."""
+    async def huge_power(prompt, model=None, function_name=None):
+        return "power", {"a": 3, "b": 10**15}
+
+    monkeypatch.setattr(main, "call_groq_function", huge_power)
+    start = time.perf_counter()
+    response = client.post("/power", json={"a": 3, "b": 2}, headers={"X-Execution-Mode": "llm"})
+    assert response.status_code == 400
+    assert time.perf_counter() - start < 1
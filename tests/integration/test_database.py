@@ -0,0 +1,320 @@
+# tests/integration/test_database.py
+
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+import backfill_results
+import main
+from app.calculation import Base, Calculation, CalculationStats, User, rebuild_calculation_stats
+from app.database import Database, to_async_url
+
+
+@pytest.fixture
+def database_file(tmp_path):
+    """Create a SQLite database file with the schema and return its sync URL."""
+    url = f"sqlite:///{tmp_path / 'calculator.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return url
+
+
+@pytest.fixture
+def sync_session(database_file):
+    """Provide a sync session on the test database for setup and assertions."""
+    engine = create_engine(database_file)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def client(database_file, monkeypatch):
+    """Create a TestClient whose app persists calculations to the test database."""
+    monkeypatch.setattr(main, "database", Database(database_file))
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture
+def user(sync_session):
+    """Create a user to own saved calculations."""
+    user = User(
+        first_name="Ada",
+        last_name="Lovelace",
+        email="ada@example.com",
+        username="ada",
+        password="hashed_password",
+    )
+    sync_session.add(user)
+    sync_session.commit()
+    return user
+
+
+def test_to_async_url():
+    """Test that sync URLs are switched to async drivers."""
+    assert to_async_url("postgresql://u:p@db:5432/app") == "postgresql+asyncpg://u:p@db:5432/app"
+    assert to_async_url("sqlite:///calc.db") == "sqlite+aiosqlite:///calc.db"
+    assert to_async_url("postgresql+asyncpg://db/app") == "postgresql+asyncpg://db/app"
+
+
+def test_operation_is_saved_for_user(client, sync_session, user):
+    """Test that an operation with a user_id is persisted as a Calculation row."""
+    response = client.post("/multiply", json={"a": 6, "b": 7, "user_id": str(user.id)})
+    assert response.status_code == 200
+    assert response.json()["result"] == 42
+
+    calculation = sync_session.query(Calculation).filter_by(user_id=user.id).one()
+    assert calculation.type == "multiplication"
+    assert calculation.inputs == [6, 7]
+    assert calculation.result == 42
+
+
+def test_operation_without_user_is_not_saved(client, sync_session):
+    """Test that anonymous operations do not write to the database."""
+    response = client.post("/add", json={"a": 1, "b": 2})
+    assert response.status_code == 200
+    assert sync_session.query(Calculation).count() == 0
+
+
+def test_operation_for_unknown_user(client, sync_session):
+    """Test that saving for an unknown user is reported as an error."""
+    user_id = uuid.uuid4()
+    response = client.post("/add", json={"a": 1, "b": 2, "user_id": str(user_id)})
+    assert response.status_code == 400
+    assert f"Unknown user: {user_id}" in response.json()["error"]
+
+
+def add_history(sync_session, user, count):
+    """Give the user `count` calculations, two per created_at timestamp."""
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        calculation = Calculation.create(["addition", "power"][i % 2], user.id, [i, 2])
+        calculation.created_at = start + timedelta(seconds=i // 2)
+        sync_session.add(calculation)
+    sync_session.commit()
+
+
+def test_history_pages_newest_first(client, sync_session, user):
+    """Test that following next_cursor visits every calculation once, newest first."""
+    add_history(sync_session, user, 25)
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 10, **({"cursor": cursor} if cursor else {})}
+        response = client.get(f"/users/{user.id}/calculations", params=params)
+        assert response.status_code == 200
+        body = response.json()
+        seen.extend(body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == 25
+    assert len({item["id"] for item in seen}) == 25
+    keys = [(item["created_at"], item["id"]) for item in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_history_filters_by_type(client, sync_session, user):
+    """Test filtering on the polymorphic discriminator."""
+    add_history(sync_session, user, 10)
+    response = client.get(f"/users/{user.id}/calculations", params={"type": "power"})
+    items = response.json()["items"]
+    assert len(items) == 5
+    assert {item["type"] for item in items} == {"power"}
+
+
+def test_history_rejects_bad_cursor_and_type(client, user):
+    """Test that malformed cursors and unknown types are client errors."""
+    response = client.get(f"/users/{user.id}/calculations", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    response = client.get(f"/users/{user.id}/calculations", params={"type": "sqrt"})
+    assert response.status_code == 400
+    assert "Unsupported calculation type: sqrt" in response.json()["error"]
+
+
+def test_history_uses_composite_index(sync_session):
+    """Test that SQLite plans the history query as a scan of the composite index."""
+    plan = sync_session.execute(text(
+        "EXPLAIN QUERY PLAN SELECT id FROM calculations WHERE user_id = 'x' "
+        "ORDER BY created_at DESC, id DESC LIMIT 10"
+    )).all()
+    assert "ix_calculations_user_id_created_at_id" in " ".join(str(row) for row in plan)
+
+
+@pytest.mark.parametrize("export_format", ["ndjson", "csv", "arrow"])
+def test_export_streams_all_rows(client, sync_session, user, export_format):
+    """Test that every export format contains all of the user's calculations, oldest first."""
+    add_history(sync_session, user, 25)
+    url = f"/users/{user.id}/calculations/export"
+    response = client.get(url, params={"format": export_format})
+    assert response.status_code == 200
+
+    if export_format == "ndjson":
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        created = [row["created_at"] for row in rows]
+    elif export_format == "csv":
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert sorted(json.loads(row["inputs"])[0] for row in rows) == list(range(25))
+        created = [row["created_at"] for row in rows]
+    else:
+        pa = pytest.importorskip("pyarrow")
+        table = pa.ipc.open_stream(response.content).read_all()
+        rows = table.to_pylist()
+        assert sorted(row["inputs"][0] for row in rows) == [float(i) for i in range(25)]
+        created = [row["created_at"] for row in rows]
+    assert len(rows) == 25
+    assert created == sorted(created)
+
+
+def test_export_filters_and_validates(client, sync_session, user):
+    """Test the type filter and rejection of unknown formats."""
+    add_history(sync_session, user, 10)
+    url = f"/users/{user.id}/calculations/export"
+    response = client.get(url, params={"type": "addition"})
+    assert {json.loads(line)["type"] for line in response.text.splitlines()} == {"addition"}
+    assert client.get(url, params={"format": "xml"}).status_code == 400
+
+
+def test_encoder_without_encode_fails_at_construction():
+    """Test that an Encoder subclass missing encode() cannot be instantiated."""
+    from app.export import Encoder
+
+    class HeaderOnlyEncoder(Encoder):
+        def header(self):
+            return b"header"
+
+    with pytest.raises(TypeError):
+        HeaderOnlyEncoder()
+
+
+def test_export_batches_are_encoded_incrementally():
+    """Test that an encoder emits output per batch rather than at the end."""
+    from app.export import CSVEncoder
+
+    row = type("Row", (), {"id": uuid.uuid4(), "type": "addition", "inputs": [1, 2], "result": 3.0,
+                           "created_at": datetime(2024, 1, 1)})
+    encoder = CSVEncoder()
+    assert encoder.header() == b"id,type,inputs,result,created_at\r\n"
+    assert encoder.encode([row]).count(b"\r\n") == 1
+    assert encoder.encode([row, row]).count(b"\r\n") == 2
+
+
+def stats_by_type(sync_session, user):
+    """Return the user's rollup rows keyed by type, as plain tuples."""
+    sync_session.expire_all()
+    return {
+        row.type: (row.count, row.result_count, row.result_sum, row.result_min, row.result_max,
+                   row.last_created_at, row.last_calculation_id)
+        for row in sync_session.query(CalculationStats).filter_by(user_id=user.id)
+    }
+
+
+def recomputed_stats(sync_session, user):
+    """Rebuild the rollup from scratch and return it like stats_by_type."""
+    rebuild_calculation_stats(sync_session)
+    return stats_by_type(sync_session, user)
+
+
+def test_stats_follow_inserts_updates_and_deletes(sync_session, user):
+    """Test that the rollup matches a full recompute after each kind of write."""
+    add_history(sync_session, user, 12)
+    stats = stats_by_type(sync_session, user)
+    assert stats["addition"][:5] == (6, 6, 2 + 4 + 6 + 8 + 10 + 12, 2, 12)
+    assert stats == recomputed_stats(sync_session, user)
+
+    calculations = sync_session.query(Calculation).order_by(Calculation.created_at, Calculation.id).all()
+    # The minimum, the latest and an interior row; then move and edit rows
+    for calculation in (calculations[0], calculations[-1], calculations[4]):
+        sync_session.delete(calculation)
+        sync_session.commit()
+        assert stats_by_type(sync_session, user) == recomputed_stats(sync_session, user)
+
+    other = User(first_name="Alan", last_name="Turing", email="alan@example.com", username="alan",
+                 password="hashed_password")
+    sync_session.add(other)
+    sync_session.commit()
+    calculations[2].user = other
+    squared = next(c for c in calculations[5:-1] if c.type == "power")
+    squared.inputs = [100, 2]
+    sync_session.commit()
+    assert sum(row[0] for row in stats_by_type(sync_session, other).values()) == 1
+    assert stats_by_type(sync_session, user)["power"][4] == 10000.0
+    assert stats_by_type(sync_session, other) == recomputed_stats(sync_session, other)
+    stats = stats_by_type(sync_session, user)
+    assert stats == recomputed_stats(sync_session, user)
+
+
+def test_stats_rows_are_removed_with_the_last_calculation(sync_session, user):
+    """Test that emptied groups and deleted users leave no rollup rows."""
+    add_history(sync_session, user, 3)
+    sync_session.delete(sync_session.query(Calculation).filter_by(type="power").one())
+    sync_session.commit()
+    assert set(stats_by_type(sync_session, user)) == {"addition"}
+
+    sync_session.delete(user)
+    sync_session.commit()
+    assert sync_session.query(CalculationStats).count() == 0
+
+
+def test_stats_endpoint(client, sync_session, user):
+    """Test that /users/{id}/stats reports per-type and overall figures."""
+    add_history(sync_session, user, 4)
+    body = client.get(f"/users/{user.id}/stats").json()
+    assert body["count"] == 4
+    assert body["last_created_at"] == "2024-01-01T00:00:01"
+    addition, power = body["types"]
+    assert (addition["type"], addition["count"], addition["result_sum"], addition["result_mean"]) == \
+        ("addition", 2, 6.0, 3.0)
+    assert (power["result_min"], power["result_max"]) == (1.0, 9.0)
+
+    empty = client.get(f"/users/{uuid.uuid4()}/stats").json()
+    assert empty["count"] == 0 and empty["types"] == []
+
+
+def test_backfill_entry_point_fills_null_results(database_file, sync_session, user, capsys):
+    """Test backfill_results.py against rows written with NULL results."""
+    add_history(sync_session, user, 6)
+    sync_session.execute(text("UPDATE calculations SET result = NULL"))
+    sync_session.execute(text("DELETE FROM calculation_stats"))
+    sync_session.commit()
+
+    backfill_results.main(["--database-url", database_file, "--batch-size", "4", "--rebuild-stats"])
+    assert capsys.readouterr().out.strip() == "Backfilled 6 calculation results."
+    sync_session.expire_all()
+    assert sync_session.query(Calculation).filter(Calculation.result.is_(None)).count() == 0
+    assert stats_by_type(sync_session, user)["addition"][:3] == (3, 3, 2 + 4 + 6)
+
+
+def test_backfill_entry_point_upgrades_an_old_schema(database_file, sync_session, user, capsys):
+    """Test that the entry point adds the result column and history index to an old table."""
+    add_history(sync_session, user, 4)
+    sync_session.execute(text("DROP INDEX ix_calculations_user_id_created_at_id"))
+    sync_session.execute(text("ALTER TABLE calculations DROP COLUMN result"))
+    sync_session.execute(text("DROP TABLE calculation_stats"))
+    sync_session.commit()
+
+    backfill_results.main(["--database-url", database_file, "--rebuild-stats"])
+    assert capsys.readouterr().out.splitlines() == [
+        "Added column calculations.result.",
+        "Created index ix_calculations_user_id_created_at_id.",
+        "Backfilled 4 calculation results.",
+    ]
+    indexes = inspect(sync_session.connection()).get_indexes("calculations")
+    assert [index["column_names"] for index in indexes] == [["user_id", "created_at", "id"]]
+    sync_session.expire_all()
+    results = {tuple(c.inputs): c.result for c in sync_session.query(Calculation)}
+    assert results == {(0, 2): 2, (1, 2): 1, (2, 2): 4, (3, 2): 9}
+    assert stats_by_type(sync_session, user)["power"][:2] == (2, 2)
+
+    backfill_results.main(["--database-url", database_file])
+    assert capsys.readouterr().out.splitlines() == ["Backfilled 0 calculation results."]
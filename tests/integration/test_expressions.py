@@ -0,0 +1,107 @@
+# tests/integration/test_expressions.py
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.expressions import MAX_EXPRESSION_LENGTH, ExpressionError, PlanCache, compile_expression
+from app.operations import CostLimitError
+
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.mark.parametrize("expression,expected", [
+    ("(a + b) * c % d", 3),
+    ("a - b / c", 0.6),
+    ("-a ** 2 + +b", 1),
+    ("power_mod(c, 100, 7) + modulus(c, d)", 3),
+    ("2.5 * a", 2.5),
+])
+def test_expressions_match_python_arithmetic(expression, expected):
+    """Test that compiled plans follow Python's precedence and the operations' semantics."""
+    plan = compile_expression(expression)
+    assert plan.evaluate({"a": 1, "b": 2, "c": 5, "d": 4}) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os').system('true')",
+    "a.real",
+    "a if b else c",
+    "a < b",
+    "[a, b]",
+    "True + 1",
+    "add(1)",
+    "add(a, b=2)",
+    "sum([1, 2])",
+    "(" * 300 + "1" + ")" * 300,
+    "a +",
+])
+def test_unsafe_or_invalid_expressions_are_rejected(expression):
+    """Test that anything outside the arithmetic whitelist fails to compile."""
+    with pytest.raises(ExpressionError):
+        compile_expression(expression)
+
+
+def test_repeated_subexpressions_are_computed_once():
+    """Test that identical steps share one register."""
+    plan = compile_expression("(a + b) * (a + b) + (a + b)")
+    assert [spec.name for spec, _ in plan.steps] == ["add", "multiply", "add"]
+    assert plan.variables == ("a", "b")
+
+
+def test_plan_cache_is_lru():
+    """Test hits, misses and eviction of the least recently used plan."""
+    cache = PlanCache(maxsize=2)
+    first = cache.get("a + 1")
+    cache.get("a + 2")
+    assert cache.get("a + 1") is first
+    cache.get("a + 3")  # Evicts "a + 2"
+    assert (cache.hits, cache.misses, len(cache)) == (1, 3, 2)
+    cache.get("a + 2")
+    assert cache.misses == 4
+
+
+def test_expensive_steps_are_refused():
+    """Test that integer powers over the power spec's max_cost are not computed."""
+    with pytest.raises(CostLimitError):
+        compile_expression("3 ** 10000000 % 7").evaluate({})
+    assert compile_expression("power_mod(3, 10000000, 7)").evaluate({}) == pow(3, 10000000, 7)
+
+
+@pytest.mark.parametrize("suffix", ["", " % 97"])
+def test_chained_integer_growth_is_refused_quickly(client, suffix):
+    """Test that products of individually cheap powers cannot stall the server."""
+    expression = "*".join(["9**300"] * 140) + suffix
+    assert len(expression) < MAX_EXPRESSION_LENGTH
+    start = time.perf_counter()
+    response = client.post("/evaluate", json={"expression": expression})
+    assert time.perf_counter() - start < 1
+    assert response.status_code == 400
+    assert "exceed 1024 bits" in response.json()["error"]
+
+
+def test_evaluate_route(client):
+    """Test /evaluate results, errors and plan reuse."""
+    misses = main.expression_plans.misses
+    body = {"expression": "(a + b) * c % d", "variables": {"a": 1, "b": 2, "c": 5, "d": 4}}
+    assert client.post("/evaluate", json=body).json() == {"result": 3}
+    assert client.post("/evaluate", json={**body, "variables": {"a": 7, "b": 1, "c": 3, "d": 5}}).json() == {
+        "result": 4
+    }
+    assert main.expression_plans.misses == misses + 1
+
+    for expression, variables, error in [
+        ("a / b", {"a": 1, "b": 0}, "Cannot divide by zero!"),
+        ("a + b", {"a": 1}, "Missing value for b."),
+        ("open('x')", {}, "Unsupported function: open"),
+        ("(-8) ** 0.5", {}, "Result is not a finite real number."),
+    ]:
+        response = client.post("/evaluate", json={"expression": expression, "variables": variables})
+        assert response.status_code == 400
+        assert response.json()["error"] == error
@@ -151,4 +151,62 @@ def test_divide_by_zero_api(client):
     
     # Assert that the 'error' field contains the correct error message
     assert "Cannot divide by zero!" in response.json()['error'], \
-        f"Expected error message 'Cannot divide by zero!', got '{response.json()['error']}'"
\ No newline at end of file
+        f"Expected error message 'Cannot divide by zero!', got '{response.json()['error']}'"
+
+# ---------------------------------------------
+# Test Functions: execution modes (local, llm,
+# upstream failure and invalid X-Execution-Mode)
+# ---------------------------------------------
+
+def test_local_execution_mode_skips_llm(client, monkeypatch):
+    """
+    Test that the local execution mode computes without calling the LLM.
+    """
+    import main
+
+    async def fail_if_called(prompt, model=None, function_name=None):
+        raise AssertionError("call_groq_function should not be called in local mode")
+
+    monkeypatch.setattr(main, "call_groq_function", fail_if_called)
+    response = client.post('/multiply', json={'a': 6, 'b': 7}, headers={'X-Execution-Mode': 'local'})
+    assert response.status_code == 200
+    assert response.json()['result'] == 42
+
+def test_llm_execution_mode_uses_function_call(client, monkeypatch):
+    """
+    Test that the llm execution mode computes with the operands returned by the model.
+    """
+    import main
+    prompts = []
+
+    async def fake_call_groq_function(prompt, model=None, function_name=None):
+        prompts.append(prompt)
+        return "add", {"a": 1, "b": 2}
+
+    monkeypatch.setattr(main, "call_groq_function", fake_call_groq_function)
+    response = client.post('/add', json={'a': 1, 'b': 2}, headers={'X-Execution-Mode': 'llm'})
+    assert response.status_code == 200
+    assert response.json()['result'] == 3
+    assert prompts == ["add 1.0 and 2.0"]
+
+def test_llm_execution_mode_upstream_failure(client, monkeypatch):
+    """
+    Test that a failed LLM call in llm mode is reported as an error.
+    """
+    import main
+
+    async def failing_call_groq_function(prompt, model=None, function_name=None):
+        return None, None
+
+    monkeypatch.setattr(main, "call_groq_function", failing_call_groq_function)
+    response = client.post('/add', json={'a': 1, 'b': 2}, headers={'X-Execution-Mode': 'llm'})
+    assert response.status_code == 400
+    assert "Failed to call external API for addition." in response.json()['error']
+
+def test_invalid_execution_mode(client):
+    """
+    Test that an unknown X-Execution-Mode header is rejected.
+    """
+    response = client.post('/add', json={'a': 1, 'b': 2}, headers={'X-Execution-Mode': 'quantum'})
+    assert response.status_code == 400
+    assert "Unsupported execution mode: quantum" in response.json()['error']
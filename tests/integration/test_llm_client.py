@@ -0,0 +1,100 @@
+# tests/integration/test_llm_client.py
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from app.llm import LLMClient, parse_function_call
+
+
+def function_call_response(name: str, arguments: dict) -> dict:
+    """Build a chat-completions body in which the model called a function."""
+    return {
+        "choices": [
+            {"message": {"function_call": {"name": name, "arguments": json.dumps(arguments)}}}
+        ]
+    }
+
+
+def make_client(handler) -> LLMClient:
+    """Create an LLMClient whose requests are answered by a local handler."""
+    return LLMClient(
+        endpoint="https://llm.test/v1/chat/completions",
+        api_key="test-key",
+        transport=httpx.MockTransport(handler),
+    )
+
+
+def test_parse_function_call():
+    """Test extracting the function call from a response body."""
+    data = function_call_response("add", {"a": 1, "b": 2})
+    assert parse_function_call(data) == ("add", {"a": 1, "b": 2})
+
+
+def test_parse_function_call_without_call():
+    """Test that a plain message yields (None, None)."""
+    data = {"choices": [{"message": {"content": "3"}}]}
+    assert parse_function_call(data) == (None, None)
+
+
+def test_call_function_sends_payload():
+    """Test that the client posts the prompt, functions and auth header."""
+    seen = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen["auth"] = request.headers["Authorization"]
+        seen["body"] = json.loads(request.content)
+        return httpx.Response(200, json=function_call_response("add", {"a": 1, "b": 2}))
+
+    async def run():
+        client = make_client(handler)
+        await client.startup()
+        try:
+            return await client.call_function("add 1 and 2", [{"name": "add"}], "test-model")
+        finally:
+            await client.shutdown()
+
+    assert asyncio.run(run()) == ("add", {"a": 1, "b": 2})
+    assert seen["auth"] == "Bearer test-key"
+    assert seen["body"]["model"] == "test-model"
+    assert seen["body"]["messages"] == [{"role": "user", "content": "add 1 and 2"}]
+    assert seen["body"]["functions"] == [{"name": "add"}]
+
+
+def test_call_function_raises_on_http_error():
+    """Test that upstream errors surface as httpx.HTTPError."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(500, json={"error": "boom"})
+
+    async def run():
+        client = make_client(handler)
+        try:
+            await client.call_function("add 1 and 2", [], "test-model")
+        finally:
+            await client.shutdown()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(run())
+
+
+def test_concurrent_calls_overlap():
+    """Test that slow upstream calls do not serialize on the event loop."""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.2)
+        return httpx.Response(200, json=function_call_response("add", {"a": 1, "b": 2}))
+
+    async def run():
+        client = make_client(handler)
+        await client.startup()
+        try:
+            start = time.perf_counter()
+            await asyncio.gather(*(client.call_function("p", [], "m") for _ in range(5)))
+            return time.perf_counter() - start
+        finally:
+            await client.shutdown()
+
+    # Five 200ms calls run serially would take a full second
+    assert asyncio.run(run()) < 0.6
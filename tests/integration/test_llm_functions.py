@@ -0,0 +1,134 @@
+# tests/integration/test_llm_functions.py
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.llm import FunctionSet, LLMClient, function_schema
+from app.operations import add, divide, power, power_mod
+
+
+def test_function_schema_from_docstring():
+    """Test that the schema is generated from the signature and docstring."""
+    assert function_schema(power) == {
+        "name": "power",
+        "description": "Raise the first number to the power of the second and return the result.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "a": {"type": "number", "description": "The base number."},
+                "b": {"type": "number", "description": "The exponent."},
+            },
+            "required": ["a", "b"],
+        },
+    }
+
+
+def test_multi_line_summary_is_joined():
+    """Test that a summary wrapped over several lines is published whole."""
+    schema = function_schema(power_mod)
+    assert schema["description"] == (
+        "Raise the first number to the power of the second, modulo the third, "
+        "without computing the full power first."
+    )
+    assert list(schema["parameters"]["properties"]) == ["a", "b", "m"]
+
+
+def test_encode_payload_matches_json_payload():
+    """Test that the spliced payload bytes equal the JSON-encoded payload."""
+    functions = FunctionSet.from_callables([add, divide])
+    prompt = 'add "1" and\n2 é'
+    assert json.loads(functions.encode_payload(prompt, "test-model")) == {
+        "model": "test-model",
+        "messages": [{"role": "user", "content": prompt}],
+        "functions": functions.schemas,
+        "function_call": "auto",
+    }
+
+
+def test_only_returns_cached_single_function_set():
+    """Test selecting a single function from a set."""
+    functions = FunctionSet.from_callables([add, divide])
+    single = functions.only("divide")
+    assert single.names == ("divide",)
+    assert functions.only("divide") is single
+    with pytest.raises(KeyError):
+        functions.only("power")
+
+
+def test_client_posts_function_set():
+    """Test that the client sends a FunctionSet as its pre-encoded payload."""
+    seen = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen["body"] = json.loads(request.content)
+        seen["content_type"] = request.headers["Content-Type"]
+        message = {"function_call": {"name": "add", "arguments": '{"a": 1, "b": 2}'}}
+        return httpx.Response(200, json={"choices": [{"message": message}]})
+
+    async def run():
+        client = LLMClient("https://llm.test/v1", "key", transport=httpx.MockTransport(handler))
+        try:
+            return await client.call_function("add 1 and 2", main.LLM_FUNCTIONS.only("add"), "m")
+        finally:
+            await client.shutdown()
+
+    assert asyncio.run(run()) == ("add", {"a": 1, "b": 2})
+    assert seen["content_type"] == "application/json"
+    assert [f["name"] for f in seen["body"]["functions"]] == ["add"]
+
+
+def test_route_sends_single_function_when_enabled(monkeypatch):
+    """Test that llm_single_function limits the schema to the route's function."""
+    sent = {}
+
+    async def call_function(prompt, functions, model):
+        sent["names"] = functions.names
+        return "subtract", {"a": 5, "b": 3}
+
+    monkeypatch.setattr(main.settings, "llm_single_function", True)
+    monkeypatch.setattr(main.llm_client, "call_function", call_function)
+    main.llm_cache.clear()
+
+    result = asyncio.run(main.call_groq_function("subtract 5 and 3", function_name="subtract"))
+    assert result == ("subtract", {"a": 5, "b": 3})
+    assert sent["names"] == ("subtract",)
+    main.llm_cache.clear()
+
+
+def function_call_body(arguments):
+    return {"choices": [{"message": {"function_call": {"name": "add", "arguments": arguments}}}]}
+
+
+@pytest.mark.parametrize("content", [
+    b"not json",
+    json.dumps({"id": "no-choices"}).encode(),
+    json.dumps({"choices": []}).encode(),
+    json.dumps(function_call_body("{not json")).encode(),
+    json.dumps(function_call_body('"a string"')).encode(),
+    json.dumps(function_call_body("[1, 2]")).encode(),
+    json.dumps(function_call_body({"a": 1, "b": 2})).encode(),
+    json.dumps(function_call_body(json.dumps({"a": "one", "b": 2}))).encode(),
+    json.dumps(function_call_body(json.dumps({"a": True, "b": 2}))).encode(),
+])
+def test_malformed_upstream_response_is_a_client_error(monkeypatch, content):
+    """Test that an unusable 200 response from the model is reported as 400, not 500."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=content, headers={"Content-Type": "application/json"})
+
+    monkeypatch.setattr(main, "llm_client", LLMClient("https://llm.test/v1", "key",
+                                                      transport=httpx.MockTransport(handler)))
+    main.llm_cache.clear()
+    with TestClient(main.app) as client:
+        response = client.post("/add", json={"a": 1, "b": 2}, headers={"X-Execution-Mode": "llm"})
+        assert response.status_code == 400
+        assert response.json()["error"] == "Failed to call external API for addition."
+
+        monkeypatch.setattr(main.settings, "llm_fallback_to_local", True)
+        response = client.post("/add", json={"a": 1, "b": 2}, headers={"X-Execution-Mode": "llm"})
+        assert response.json() == {"result": 3}
+    main.llm_cache.clear()
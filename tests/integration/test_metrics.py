@@ -0,0 +1,73 @@
+# tests/integration/test_metrics.py
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test the Prometheus text format of a histogram."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/add")
+    histogram.observe(0.5, "/add")
+    histogram.observe(5, "/add")
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP latency_seconds Latency.", "# TYPE latency_seconds histogram"]
+    assert 'latency_seconds_bucket{route="/add",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/add",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{route="/add",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{route="/add"} 5.55' in lines
+    assert 'latency_seconds_count{route="/add"} 3' in lines
+
+
+def test_counter_escapes_label_values():
+    """Test that label values are escaped."""
+    registry = MetricsRegistry()
+    counter = registry.counter("errors_total", "Errors.", ("message",))
+    counter.inc('say "hi"\n')
+    assert 'errors_total{message="say \\"hi\\"\\n"} 1' in registry.render()
+
+
+def test_duplicate_metric_names_are_rejected():
+    """Test that a metric name can only be registered once."""
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests.")
+    with pytest.raises(ValueError):
+        registry.counter("requests_total", "Requests.")
+
+
+def test_requests_and_stages_are_recorded(client):
+    """Test that the middleware and route stages record a request."""
+    before_ok = main.HTTP_REQUESTS.value("POST", "/add", "200")
+    before_error = main.HTTP_REQUESTS.value("POST", "/divide", "400")
+    before_compute = main.STAGE_DURATION.count("/add", "compute")
+
+    assert client.post("/add", json={"a": 1, "b": 2}).status_code == 200
+    assert client.post("/divide", json={"a": 1, "b": 0}).status_code == 400
+
+    assert main.HTTP_REQUESTS.value("POST", "/add", "200") == before_ok + 1
+    assert main.HTTP_REQUESTS.value("POST", "/divide", "400") == before_error + 1
+    assert main.STAGE_DURATION.count("/add", "compute") == before_compute + 1
+    assert main.STAGE_DURATION.count("/add", "validation") >= 1
+
+
+def test_metrics_endpoint(client):
+    """Test that /metrics serves the Prometheus text format."""
+    client.post("/multiply", json={"a": 2, "b": 3})
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'http_requests_total{method="POST",route="/multiply",status="200"}' in body
+    assert 'calculator_stage_duration_seconds_count{route="/multiply",stage="compute"}' in body
+    assert "# TYPE llm_cache_hits_total counter" in body
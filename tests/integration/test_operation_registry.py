@@ -0,0 +1,57 @@
+# tests/integration/test_operation_registry.py
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.calculation import Calculation, compute_result
+from app.operations.registry import OPERATIONS
+
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_every_operation_has_route_schema_and_batch_entry():
+    """Test that routes, the LLM schema and /batch are all generated from the registry."""
+    paths = {route.path for route in main.app.routes}
+    for name, spec in OPERATIONS.items():
+        assert f"/{name}" in paths
+        assert main.LLM_FUNCTIONS.only(name).schemas[0]["name"] == name
+        assert main.BATCH_OPERATIONS[name] is spec.func
+        assert spec.arity == (3 if name == "power_mod" else 2)
+
+
+def test_factory_builds_registered_calculation_classes():
+    """Test that Calculation.create resolves every registered calculation type."""
+    for spec in OPERATIONS.values():
+        calculation = Calculation.create(spec.calculation_type, None, [1, 2])
+        assert type(calculation) is spec.calculation_class
+    with pytest.raises(ValueError):
+        Calculation.create("calculation", None, [1, 2])
+
+
+def test_stored_results_dispatch_to_the_calculation_classes():
+    """Test that compute_result agrees with each registered operation, with no table of its own."""
+    for spec in OPERATIONS.values():
+        operands = [7, 3, 5][:spec.arity]
+        assert compute_result(spec.calculation_type, operands) == spec.func(*operands)
+    with pytest.raises(ValueError):
+        compute_result("calculation", [1, 2])
+
+
+@pytest.mark.parametrize("path", ["/divide", "/modulus"])
+def test_zero_divisor_is_rejected(client, path):
+    """Test the nonzero_divisor validation rule."""
+    response = client.post(path, json={"a": 5, "b": 0})
+    assert response.status_code == 400
+    assert response.json()["error"] == "Cannot divide by zero!"
+
+
+def test_non_real_result_is_rejected(client):
+    """Test that a complex power result is reported as a client error."""
+    response = client.post("/power", json={"a": -8, "b": 0.5})
+    assert response.status_code == 400
+    assert response.json()["error"] == "Result is not a finite real number."
@@ -0,0 +1,182 @@
+# tests/integration/test_resilience.py
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.llm import LLMClient
+from app.resilience import (
+    Bulkhead,
+    BulkheadFullError,
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientCaller,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def stub_upstream(statuses, headers=None):
+    """
+    Return an httpx handler answering with the given statuses in turn (the
+    last one repeats) and the list of requests it received.
+    """
+    received = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = statuses[min(len(received), len(statuses) - 1)]
+        received.append(request)
+        if status != 200:
+            return httpx.Response(status, headers=headers or {})
+        message = {"function_call": {"name": "add", "arguments": json.dumps({"a": 1, "b": 2})}}
+        return httpx.Response(200, json={"choices": [{"message": message}]})
+
+    return handler, received
+
+
+def make_caller(breaker=None, bulkhead=None, attempts=3):
+    """Create a ResilientCaller that records its backoff delays instead of sleeping."""
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    caller = ResilientCaller(
+        breaker or CircuitBreaker(failure_threshold=5, reset_timeout=30.0),
+        bulkhead or Bulkhead(10),
+        attempts=attempts,
+        base_delay=0.1,
+        max_delay=2.0,
+        sleep=sleep,
+    )
+    return caller, delays
+
+
+def call_upstream(caller, handler):
+    """Run one LLMClient.call_function through caller against the stub handler."""
+    async def run():
+        client = LLMClient("https://llm.test/v1", "key", transport=httpx.MockTransport(handler))
+        try:
+            return await caller.call(lambda: client.call_function("add 1 and 2", [{"name": "add"}], "m"))
+        finally:
+            await client.shutdown()
+
+    return asyncio.run(run())
+
+
+def test_retries_transient_errors_with_backoff():
+    """Test that 503 and 429 responses are retried and then succeed."""
+    handler, received = stub_upstream([503, 429, 200])
+    caller, delays = make_caller()
+
+    assert call_upstream(caller, handler) == ("add", {"a": 1, "b": 2})
+    assert len(received) == 3
+    assert caller.retries == 2
+    assert 0.05 <= delays[0] <= 0.1 and 0.1 <= delays[1] <= 0.2
+
+
+def test_retry_after_header_is_honoured_and_capped():
+    """Test that Retry-After sets the delay, capped at max_delay."""
+    handler, _ = stub_upstream([429, 200], headers={"Retry-After": "60"})
+    caller, delays = make_caller()
+    call_upstream(caller, handler)
+    assert delays == [2.0]
+
+
+def test_client_errors_are_not_retried():
+    """Test that a 400 fails immediately without counting against the breaker."""
+    handler, received = stub_upstream([400])
+    caller, delays = make_caller()
+    with pytest.raises(httpx.HTTPStatusError):
+        call_upstream(caller, handler)
+    assert len(received) == 1 and delays == []
+    assert caller.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_retries_are_bounded():
+    """Test that the last error is raised once attempts are exhausted."""
+    handler, received = stub_upstream([500])
+    caller, _ = make_caller(attempts=3)
+    with pytest.raises(httpx.HTTPStatusError):
+        call_upstream(caller, handler)
+    assert len(received) == 3
+
+
+def test_circuit_opens_fails_fast_and_recovers():
+    """Test the closed -> open -> half-open -> closed cycle."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0, clock=clock)
+    handler, received = stub_upstream([500, 500, 200])
+    caller, _ = make_caller(breaker=breaker, attempts=2)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        call_upstream(caller, handler)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        call_upstream(caller, handler)
+    assert len(received) == 2  # Rejected without reaching the upstream
+    assert caller.rejected == 1
+
+    clock.now = 10.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert call_upstream(caller, handler) == ("add", {"a": 1, "b": 2})
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_probe_reopens_circuit():
+    """Test that a failure while half-open opens the circuit again."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0, clock=clock)
+    breaker.record_failure()
+    clock.now = 10.0
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # Only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_bulkhead_caps_concurrency():
+    """Test that calls beyond the cap are rejected once the wait times out."""
+    caller, _ = make_caller(bulkhead=Bulkhead(2, timeout=0.05))
+    active = []
+    peak = []
+
+    async def slow_call():
+        active.append(1)
+        peak.append(len(active))
+        await asyncio.sleep(0.2)
+        active.pop()
+        return "ok"
+
+    async def run():
+        return await asyncio.gather(*(caller.call(slow_call) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert results.count("ok") == 2
+    assert isinstance(results[2], BulkheadFullError)
+    assert max(peak) == 2
+
+
+def test_route_falls_back_to_local_computation(monkeypatch):
+    """Test llm_fallback_to_local when the upstream call fails."""
+    async def failing_call_groq_function(prompt, model=None, function_name=None):
+        return None, None
+
+    monkeypatch.setattr(main, "call_groq_function", failing_call_groq_function)
+    monkeypatch.setattr(main.settings, "llm_fallback_to_local", True)
+    with TestClient(main.app) as client:
+        response = client.post("/add", json={"a": 1, "b": 2}, headers={"X-Execution-Mode": "llm"})
+    assert response.status_code == 200
+    assert response.json()["result"] == 3
@@ -0,0 +1,257 @@
+# tests/integration/test_user_seed.py
+
+import importlib
+import itertools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import sessionmaker
+
+from app.calculation import Base, User
+from app.schema import UserData
+
+
+def make_user_data(i: int) -> UserData:
+    return UserData(first_name="Test", last_name="User", email=f"user{i}@example.com",
+                    username=f"user{i}", password="Password123!")
+
+
+@pytest.fixture
+def user_seed(tmp_path, monkeypatch):
+    """Import user_seed with placeholder settings and point it at a SQLite file."""
+    for name, value in {"db_host": "localhost", "db_port": "5432", "db_user": "u", "db_password": "p",
+                        "db_name": "d", "salt": "abc"}.items():
+        monkeypatch.setenv(name, value)
+    module = importlib.import_module("user_seed")
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(module, "engine", engine)
+    monkeypatch.setattr(module, "Session", sessionmaker(bind=engine))
+    yield module
+    engine.dispose()
+
+
+def test_bulk_seed_with_nothing_to_add(user_seed, monkeypatch, capsys):
+    """Test that a count of 0 returns before starting the pipeline."""
+    def no_pipeline(*args, **kwargs):
+        raise AssertionError("The pipeline should not start.")
+
+    monkeypatch.setattr(user_seed, "user_pipeline", no_pipeline)
+    user_seed.seed_users_bulk(0)
+    assert capsys.readouterr().out == "No users to add.\n"
+
+
+def test_bulk_seed_inserts_count_users(user_seed):
+    """Test that bulk mode stops at exactly count users across chunks."""
+    user_seed.seed_users_bulk(5, chunk_size=2)
+    with user_seed.Session() as session:
+        assert session.query(User).count() == 5
+
+
+def test_raw_users_are_not_remembered(user_seed):
+    """Test that generating users keeps no per-user state in Faker."""
+    list(itertools.islice(user_seed.generate_raw_users(), 100))
+    assert not any(user_seed.fake.unique._seen.values())
+
+
+def test_drop_existing_users_drops_repeats_within_a_batch(user_seed):
+    """Test that a batch repeating an email or username keeps only the first user."""
+    first, second, third = (make_user_data(i) for i in range(3))
+    second = second.model_copy(update={"email": first.email})
+    third = third.model_copy(update={"username": first.username})
+    with user_seed.Session() as session:
+        kept = user_seed.drop_existing_users(session, [(first, "h1"), (second, "h2"), (third, "h3")])
+    assert kept == [(first, "h1")]
+
+
+PASSWORDS = ["first-password", "second-password", "third-password"]
+
+
+def assert_hashes_match(user_seed, hashes):
+    assert len(hashes) == len(PASSWORDS)
+    for password, hashed in zip(PASSWORDS, hashes):
+        assert user_seed.pwd_context.verify(password + "pepper", hashed)
+
+
+def test_hash_passwords_inline(user_seed, monkeypatch):
+    """Test that one worker hashes in the calling process, in input order."""
+    def no_pool(*args, **kwargs):
+        raise AssertionError("One worker should not start a process pool.")
+
+    monkeypatch.setattr(user_seed, "ProcessPoolExecutor", no_pool)
+    assert_hashes_match(user_seed, user_seed.hash_passwords(PASSWORDS, "pepper", workers=1))
+
+
+def test_hash_passwords_with_worker_processes(user_seed):
+    """Test that hashes from a process pool come back in input order."""
+    assert_hashes_match(user_seed, user_seed.hash_passwords(PASSWORDS, "pepper", workers=2))
+
+
+def test_hash_passwords_with_an_injected_executor(user_seed):
+    """Test that an existing executor is used and left running."""
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert_hashes_match(user_seed, user_seed.hash_passwords(PASSWORDS, "pepper", executor=executor))
+        assert executor.submit(sum, [1, 2]).result() == 3
+
+
+def test_stage_errors_are_raised_in_the_consumer(user_seed):
+    """Test that an exception in a stage thread reaches whoever iterates it."""
+    def failing():
+        yield 1
+        raise RuntimeError("stage failed")
+
+    stage = user_seed.run_in_thread(failing(), maxsize=1)
+    assert next(stage) == 1
+    with pytest.raises(RuntimeError, match="stage failed"):
+        next(stage)
+
+
+def test_closing_a_stage_stops_its_thread(user_seed):
+    """Test that closing the consumer stops its thread and closes an endless upstream."""
+    closed = threading.Event()
+
+    def endless():
+        try:
+            yield from itertools.count()
+        finally:
+            closed.set()
+
+    stage = user_seed.run_in_thread(endless(), maxsize=2)
+    assert next(stage) == 0
+    stage.close()
+    assert closed.is_set()
+
+
+def test_closing_the_pipeline_stops_every_stage(user_seed):
+    """Test that the generate, validate and hash threads have all exited once closed."""
+    threads = threading.active_count()
+    pipeline = user_seed.user_pipeline(batch_size=2, queue_size=4)
+    batch = next(pipeline)
+    assert len(batch) == 2
+    assert threading.active_count() >= threads + 3
+    pipeline.close()
+    assert threading.active_count() == threads
+
+
+def test_orm_seed_inserts_count_users(user_seed):
+    """Test that ORM mode, the CLI default, stops at exactly count users across chunks."""
+    user_seed.seed_users(5, chunk_size=2)
+    with user_seed.Session() as session:
+        assert session.query(User).count() == 5
+
+
+def test_bloom_filter_has_no_false_negatives(user_seed):
+    """Test that every added value is reported as present."""
+    bloom = user_seed.BloomFilter(capacity=5000, error_rate=0.01)
+    values = [f"email:user{i}@example.com" for i in range(5000)]
+    for value in values:
+        bloom.add(value)
+    assert all(value in bloom for value in values)
+
+
+def test_bloom_filter_false_positive_rate(user_seed):
+    """Test that values never added are reported present at about error_rate."""
+    bloom = user_seed.BloomFilter(capacity=10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"added-{i}")
+    false_positives = sum(f"absent-{i}" in bloom for i in range(20_000))
+    assert false_positives / 20_000 < 0.02
+
+
+def add_existing_user(user_seed, user_data) -> None:
+    with user_seed.Session() as session:
+        session.add(User(first_name=user_data.first_name, last_name=user_data.last_name,
+                         email=user_data.email, username=user_data.username, password="hashed"))
+        session.commit()
+
+
+def test_existing_users_are_dropped_and_loaded_into_the_bloom_filter(user_seed):
+    """Test that taken emails and usernames are dropped and known to the Bloom filter."""
+    existing = make_user_data(0)
+    add_existing_user(user_seed, existing)
+    same_email = make_user_data(1).model_copy(update={"email": existing.email})
+    same_username = make_user_data(2).model_copy(update={"username": existing.username})
+    new = make_user_data(3)
+    with user_seed.Session() as session:
+        kept = user_seed.drop_existing_users(
+            session, [(same_email, "h1"), (same_username, "h2"), (new, "h3")]
+        )
+        bloom = user_seed.load_bloom_filter(session, extra_capacity=10)
+    assert kept == [(new, "h3")]
+    assert f"email:{existing.email}" in bloom and f"username:{existing.username}" in bloom
+
+
+@pytest.mark.parametrize("bloom", [False, True])
+def test_bulk_seed_replaces_colliding_users(user_seed, monkeypatch, bloom):
+    """Test that bulk mode still reaches count when generated users collide."""
+    add_existing_user(user_seed, make_user_data(0))
+
+    def colliding_users():
+        # Every user is generated twice, and user 0 already exists
+        for i in itertools.count():
+            user = make_user_data(i).model_dump()
+            yield user
+            yield user
+
+    monkeypatch.setattr(user_seed, "generate_raw_users", colliding_users)
+    monkeypatch.setattr(user_seed, "hash_passwords", lambda passwords, *args: ["hashed"] * len(passwords))
+    user_seed.seed_users_bulk(5, chunk_size=3, bloom=bloom)
+    with user_seed.Session() as session:
+        assert session.query(User).count() == 6
+
+
+@pytest.fixture
+def sql_logging(user_seed):
+    """Leave the sqlalchemy.engine logger switched off after the test."""
+    yield user_seed.configure_sql_logging
+    user_seed.configure_sql_logging("off")
+
+
+def test_sql_logging_off(user_seed, sql_logging, tmp_path):
+    """Test that off mode leaves statement logging disabled, with no handlers."""
+    assert sql_logging("off", log_file=str(tmp_path / "sql.log")) is None
+    assert not user_seed.sqlalchemy_logger.isEnabledFor(logging.INFO)
+    assert user_seed.sqlalchemy_logger.handlers == []
+    assert not (tmp_path / "sql.log").exists()
+
+
+def test_sampled_sql_logging_keeps_every_nth_statement_with_its_parameters(user_seed, sql_logging, tmp_path):
+    """Test that sampled mode writes every third statement, with its parameters, once stopped."""
+    log_file = tmp_path / "sql.log"
+    listener = sql_logging("sampled", sample_every=3, log_file=str(log_file))
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        for i in range(6):
+            connection.execute(text(f"SELECT :value AS column_{i}"), {"value": i})
+    listener.stop()
+    engine.dispose()
+
+    # Statements logged: BEGIN, the six SELECTs and ROLLBACK
+    lines = [line.split(" - INFO - ", 1)[1] for line in log_file.read_text().splitlines()]
+    assert len(lines) == 5
+    assert lines[0] == "BEGIN (implicit)"
+    assert lines[1] == "SELECT ? AS column_2" and lines[2].startswith("[") and lines[2].endswith("(2,)")
+    assert lines[3] == "SELECT ? AS column_5" and lines[4].startswith("[") and lines[4].endswith("(5,)")
+
+
+def test_insert_without_returning_on_other_dialects(user_seed):
+    """Test that dialects other than PostgreSQL and SQLite insert without RETURNING."""
+    executed = []
+
+    class MySQLSession:
+        def get_bind(self):
+            return SimpleNamespace(dialect=mysql.dialect())
+
+        def execute(self, statement, rows):
+            executed.append(str(statement.compile(dialect=mysql.dialect())))
+            return SimpleNamespace(rowcount=len(rows) - 1)
+
+    rows = user_seed.build_user_rows([make_user_data(0), make_user_data(1)], ["h0", "h1"])
+    assert user_seed.insert_user_rows(MySQLSession(), rows) == 1
+    assert executed[0].startswith("INSERT IGNORE INTO users")
+    assert "RETURNING" not in executed[0]
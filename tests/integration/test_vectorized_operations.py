@@ -0,0 +1,76 @@
+# tests/integration/test_vectorized_operations.py
+
+from array import array
+
+import numpy as np
+import pytest
+
+from app.operations import add, divide, modulus, multiply, power, subtract
+from app.operations.vectorized import (
+    add_array,
+    divide_array,
+    modulus_array,
+    multiply_array,
+    power_array,
+    subtract_array,
+)
+
+A = [10, -7.5, 3, 0, 2.25]
+B = [4, 2, -3, 5, 0.5]
+
+
+@pytest.mark.parametrize("scalar_func, array_func", [
+    (add, add_array),
+    (subtract, subtract_array),
+    (multiply, multiply_array),
+    (power, power_array),
+])
+def test_matches_scalar_operations(scalar_func, array_func):
+    """Test that vectorized results match the scalar functions elementwise."""
+    expected = [scalar_func(a, b) for a, b in zip(A, B)]
+    np.testing.assert_allclose(array_func(A, B), expected)
+
+
+@pytest.mark.parametrize("scalar_func, array_func", [
+    (divide, divide_array),
+    (modulus, modulus_array),
+])
+def test_division_matches_scalar_operations(scalar_func, array_func):
+    """Test that divide and modulus match the scalar functions for non-zero divisors."""
+    expected = [scalar_func(a, b) for a, b in zip(A, B)]
+    result, zero_mask = array_func(A, B)
+    np.testing.assert_allclose(result, expected)
+    assert not zero_mask.any()
+
+
+@pytest.mark.parametrize("array_func", [divide_array, modulus_array])
+def test_zero_divisor_is_masked(array_func):
+    """Test that zero divisors are reported via the mask instead of raising."""
+    result, zero_mask = array_func([1, 2, 3], [1, 0, 2])
+    assert zero_mask.tolist() == [False, True, False]
+    assert np.isnan(result[1])
+    assert not np.isnan(result[[0, 2]]).any()
+
+
+@pytest.mark.parametrize("array_func, expected", [(divide_array, 2.0), (modulus_array, 0.0)])
+@pytest.mark.parametrize("wrap", [lambda x: x, np.float64, np.asarray])
+def test_scalar_and_zero_dimensional_inputs(array_func, expected, wrap):
+    """Test that divide and modulus accept Python scalars, NumPy scalars and 0-d arrays."""
+    result, zero_mask = array_func(wrap(6), wrap(3))
+    assert result.shape == () and result == expected and not zero_mask
+    result, zero_mask = array_func(wrap(1), wrap(0))
+    assert np.isnan(result) and zero_mask
+
+
+def test_accepts_buffers_and_broadcasts():
+    """Test array.array and memoryview inputs and scalar broadcasting."""
+    a = array("d", [1.0, 2.0, 3.0])
+    b = memoryview(array("i", [1, 1, 1]))
+    assert add_array(a, b).tolist() == [2.0, 3.0, 4.0]
+    assert multiply_array(a, 2).tolist() == [2.0, 4.0, 6.0]
+
+
+def test_integer_inputs_do_not_overflow():
+    """Test that large integer inputs are computed in float64."""
+    big = np.array([2 ** 62], dtype=np.int64)
+    assert multiply_array(big, big)[0] == pytest.approx(2.0 ** 124)
@@ -1,14 +1,26 @@
 import os
 import argparse
-from typing import Optional, List
+import csv
+import hashlib
+import io
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Iterable, Iterator, Optional, List, Tuple
 from datetime import datetime
 import uuid  # Import Python's uuid module
 import logging  # Import the logging module
+from logging.handlers import QueueHandler, QueueListener
 
 from dotenv import load_dotenv
 from faker import Faker
 from pydantic_settings import BaseSettings
-from sqlalchemy import create_engine, Column, String, DateTime
+from sqlalchemy import create_engine, func, insert, or_, select, text, Column, String, DateTime
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.dialects.postgresql import UUID  # Import SQLAlchemy's UUID type for PostgreSQL
 from sqlalchemy.orm import declarative_base, sessionmaker
 from sqlalchemy.exc import IntegrityError
@@ -20,26 +32,67 @@ from app.schema import UserData
 from app.settings import Settings
 
 # ------------------- SQLAlchemy Logging Configuration Start -------------------
+# Statement logging is off unless --sql-log asks for it. When enabled, records
+# are handed to a queue and written to LOG_FILE by a listener thread, so the
+# seeding threads never block on file I/O.
 
-# Configure Logging
 LOG_FILE = 'sql.log'  # Define your SQL log file path here
+SQL_LOG_MODES = ('off', 'sampled', 'full')
 
 # Create a logger for SQLAlchemy
 sqlalchemy_logger = logging.getLogger('sqlalchemy.engine')
-sqlalchemy_logger.setLevel(logging.INFO)  # Set the desired logging level (DEBUG for more details)
 
-# Create a FileHandler to write logs to the specified file
-file_handler = logging.FileHandler(LOG_FILE)
-file_handler.setLevel(logging.INFO)
+class SampledStatementFilter(logging.Filter):
+    """
+    Keeps every `every`-th SQL statement. SQLAlchemy logs a statement's
+    parameters as a separate record starting with '[', which follows the
+    decision made for its statement.
+    """
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, every)
+        self.count = 0
+        self.keep = False
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not str(record.msg).startswith('['):
+            self.keep = self.count % self.every == 0
+            self.count += 1
+        return self.keep
+
+def configure_sql_logging(mode: str = 'off', sample_every: int = 100,
+                          log_file: str = LOG_FILE) -> Optional[QueueListener]:
+    """
+    Configures the sqlalchemy.engine logger for `mode` and returns the started
+    QueueListener writing to `log_file` (None when logging is off). Stop the
+    listener to flush pending records.
+    """
+    if mode not in SQL_LOG_MODES:
+        raise ValueError(f"Unknown SQL log mode: {mode}")
+    for handler in list(sqlalchemy_logger.handlers):
+        sqlalchemy_logger.removeHandler(handler)
 
-# Define a formatter and set it for the handler
-formatter = logging.Formatter(
-    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-file_handler.setFormatter(formatter)
+    if mode == 'off':
+        # Above INFO, SQLAlchemy skips building statement log records entirely
+        sqlalchemy_logger.setLevel(logging.WARNING)
+        return None
 
-# Add the handler to the SQLAlchemy logger
-sqlalchemy_logger.addHandler(file_handler)
+    sqlalchemy_logger.setLevel(logging.INFO)
+
+    # Create a FileHandler to write logs to the specified file
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setFormatter(logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    ))
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    if mode == 'sampled':
+        # On the handler: logger filters do not see records from child loggers
+        queue_handler.addFilter(SampledStatementFilter(sample_every))
+    sqlalchemy_logger.addHandler(queue_handler)
+    listener = QueueListener(log_queue, file_handler)
+    listener.start()
+    return listener
 
 # -------------------- SQLAlchemy Logging Configuration End --------------------
 
@@ -58,7 +111,7 @@ DATABASE_URL = f'postgresql://{settings.db_user}:{settings.db_password}@{setting
 
 # Initialize SQLAlchemy base and engine
 Base = declarative_base()
-engine = create_engine(DATABASE_URL, echo=True)  # echo=True for SQL logging
+engine = create_engine(DATABASE_URL)  # SQL logging is set up by configure_sql_logging
 
 
 # Create a session maker
@@ -80,62 +133,274 @@ def hash_password(plain_password: str, salt: str) -> str:
     salted_password = plain_password + salt
     return pwd_context.hash(salted_password)
 
-def generate_fake_user(existing_emails: set, existing_usernames: set) -> UserData:
+def hash_passwords(passwords: List[str], salt: str, workers: int = 1,
+                   executor: Optional[Executor] = None) -> List[str]:
     """
-    Generates a fake user with unique email and username.
+    Hashes passwords with hash_password, fanning the work out over `workers`
+    processes (or an existing executor). Passwords are submitted in chunks and
+    the hashes are returned in the same order as the input.
+    """
+    if executor is None and (workers <= 1 or len(passwords) <= 1):
+        return [hash_password(password, salt) for password in passwords]
+
+    # A few chunks per worker keeps IPC overhead low while balancing the load
+    chunksize = max(1, len(passwords) // (max(workers, 1) * 4))
+    if executor is not None:
+        return list(executor.map(partial(hash_password, salt=salt), passwords, chunksize=chunksize))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(partial(hash_password, salt=salt), passwords, chunksize=chunksize))
+
+# ------------------------- Seeding Pipeline Start -------------------------
+# generate -> validate -> batch + hash -> insert, each stage in its own thread
+# connected by bounded queues, so the stages overlap and at most a few
+# batches of users are in memory at any time.
+
+PIPELINE_QUEUE_SIZE = 1000  # Items buffered between two pipeline stages
+
+_STAGE_DONE = object()
+
+class _StageError:
+    """
+    Carries an exception raised in a stage thread to its consumer.
+    """
+    def __init__(self, error: BaseException):
+        self.error = error
+
+def run_in_thread(items: Iterable, maxsize: int) -> Iterator:
+    """
+    Drains `items` in a background thread and yields them through a queue of
+    at most `maxsize` entries. Exceptions are re-raised in the consumer, and
+    closing the returned generator stops the thread and waits for it, so no
+    stage is left running (e.g. mid-hash) when the caller exits.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_StageError(e))
+            return
+        finally:
+            # Close upstream stages from the thread that drives them
+            close = getattr(items, 'close', None)
+            if close is not None:
+                close()
+        put(_STAGE_DONE)
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _STAGE_DONE:
+                return
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    """
+    Groups items into lists of `size` (the last one may be shorter).
+    """
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def generate_raw_users() -> Iterator[dict]:
+    """
+    Endlessly generates unvalidated fake user fields. Emails and usernames
+    may repeat; collisions are dropped further down the pipeline (Bloom
+    filter, drop_existing_users, ON CONFLICT DO NOTHING) and replaced, since
+    Faker's unique proxy would remember every value it ever returned.
     """
     while True:
-        # Generate a random password
-        plain_password = fake.password(length=12)
-        
-        user_data = UserData(
-            first_name=fake.first_name(),
-            last_name=fake.last_name(),
-            email=fake.unique.email(),
-            username=fake.unique.user_name(),
-            password=plain_password
-        )
-        if user_data.email not in existing_emails and user_data.username not in existing_usernames:
-            existing_emails.add(user_data.email)
-            existing_usernames.add(user_data.username)
-            return user_data
+        yield {
+            'first_name': fake.first_name(),
+            'last_name': fake.last_name(),
+            'email': fake.email(),
+            'username': fake.user_name(),
+            'password': fake.password(length=12),
+        }
+
+class BloomFilter:
+    """
+    Compact set-membership filter: `in` may report false positives at about
+    `error_rate`, but never false negatives. Used to pre-check emails and
+    usernames without holding the strings themselves in memory.
+    """
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: str) -> Iterator[int]:
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+def load_bloom_filter(session, extra_capacity: int) -> BloomFilter:
+    """
+    Builds a BloomFilter of existing emails and usernames, streaming them from
+    the database instead of materializing them.
+    """
+    existing = session.scalar(select(func.count()).select_from(User.__table__))
+    bloom = BloomFilter(capacity=2 * (existing + extra_capacity))
+    rows = session.execute(
+        select(User.email, User.username).execution_options(yield_per=10_000)
+    )
+    for email, username in rows:
+        bloom.add(f"email:{email}")
+        bloom.add(f"username:{username}")
+    print(f"Loaded {existing} existing users into the Bloom filter.")
+    return bloom
+
+def validate_users(raw_users: Iterable[dict], seen: Optional[BloomFilter] = None) -> Iterator[UserData]:
+    """
+    Validates raw users against UserData and drops invalid ones. With a Bloom
+    filter, users whose email or username may already exist are dropped too;
+    without one, duplicates are left to the database's unique constraints.
+    """
+    for raw_user in raw_users:
+        try:
+            user_data = UserData(**raw_user)
+        except ValidationError:
+            continue
+        if seen is not None:
+            email_key, username_key = f"email:{user_data.email}", f"username:{user_data.username}"
+            if email_key in seen or username_key in seen:
+                continue
+            seen.add(email_key)
+            seen.add(username_key)
+        yield user_data
+
+def hash_user_batches(users: Iterable[UserData], salt: str, batch_size: int, workers: int = 1,
+                      executor: Optional[Executor] = None) -> Iterator[List[Tuple[UserData, str]]]:
+    """
+    Groups users into batches and pairs each user with its password hash.
+    """
+    for batch in batched(users, batch_size):
+        hashed_passwords = hash_passwords([u.password for u in batch], salt, workers, executor)
+        yield list(zip(batch, hashed_passwords))
+
+def pipeline_lookahead(batch_size: int, queue_size: int = PIPELINE_QUEUE_SIZE) -> int:
+    """
+    Most users the pipeline validates beyond those its consumer has taken:
+    the validated queue, the hashed-batch queue and the batch being hashed.
+    A Bloom filter passed to user_pipeline needs room for them too, or it
+    saturates and the validation stage rejects every new user.
+    """
+    return 2 * (queue_size + batch_size)
+
+def user_pipeline(batch_size: int, workers: int = 1, executor: Optional[Executor] = None,
+                  seen: Optional[BloomFilter] = None,
+                  queue_size: int = PIPELINE_QUEUE_SIZE) -> Iterator[List[Tuple[UserData, str]]]:
+    """
+    Endlessly yields new users in batches of (UserData, hashed password)
+    pairs, ready to insert. Generation, validation and hashing run
+    concurrently; the consumer takes batches until enough users were inserted
+    (rejected duplicates are replaced by later batches) and then closes it.
+    """
+    raw_users = run_in_thread(generate_raw_users(), queue_size)
+    valid_users = run_in_thread(validate_users(raw_users, seen), queue_size)
+    hashed_batches = run_in_thread(
+        hash_user_batches(valid_users, settings.salt, batch_size, workers, executor),
+        max(1, queue_size // batch_size),
+    )
+    try:
+        yield from hashed_batches
+    finally:
+        # Stops the hashing thread, which in turn closes the earlier stages
+        hashed_batches.close()
+
+# -------------------------- Seeding Pipeline End --------------------------
+
+def drop_existing_users(session, batch: List[Tuple[UserData, str]]) -> List[Tuple[UserData, str]]:
+    """
+    Removes users whose email or username is already taken, with one indexed
+    lookup per batch rather than loading the whole table, and repeats within
+    the batch itself.
+    """
+    emails = [user_data.email for user_data, _ in batch]
+    usernames = [user_data.username for user_data, _ in batch]
+    taken = set()
+    for email, username in session.execute(
+        select(User.email, User.username).where(or_(User.email.in_(emails), User.username.in_(usernames)))
+    ):
+        taken.update((email, username))
+    kept = []
+    for user_data, hashed_password in batch:
+        if user_data.email in taken or user_data.username in taken:
+            continue
+        taken.update((user_data.email, user_data.username))
+        kept.append((user_data, hashed_password))
+    return kept
 
-def seed_users(count: int):
+def seed_users(count: int, workers: int = 1, chunk_size: int = 1000, bloom: bool = False):
     """
-    Seeds the users table with fake data.
+    Seeds the users table with fake data through the ORM in one transaction.
+    Users stream through the pipeline and are flushed and released from the
+    session chunk by chunk, hashing passwords on `workers` processes. Users
+    that collide with existing rows are dropped and replaced.
     """
     print("Creating tables if they don't exist...")
     # Create tables if they don't exist
     Base.metadata.create_all(engine)
 
     session = Session()
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
     try:
-        print("Fetching existing emails and usernames to prevent duplicates...")
-        # Fetch existing emails and usernames to prevent duplicates
-        existing_emails = set(email for (email,) in session.query(User.email).all())
-        existing_usernames = set(username for (username,) in session.query(User.username).all())
-        print(f"Found {len(existing_emails)} existing emails and {len(existing_usernames)} existing usernames.")
-
-        users_to_add: List[User] = []
-        for i in range(1, count + 1):
-            print(f"Generating user {i}...")
-            user_data = generate_fake_user(existing_emails, existing_usernames)
-            hashed_password = hash_password(user_data.password, settings.salt)
-            user = User(
-                first_name=user_data.first_name,
-                last_name=user_data.last_name,
-                email=user_data.email,
-                username=user_data.username,
-                password=hashed_password
-            )
-            users_to_add.append(user)
-            print(f"User {i}: {user.username} created.")
-
-        print("Adding users to the session...")
-        session.add_all(users_to_add)  # Use add_all instead of bulk_save_objects
+        seen = load_bloom_filter(session, count + pipeline_lookahead(chunk_size)) if bloom else None
+        added = 0
+        pipeline = user_pipeline(chunk_size, workers, executor, seen)
+        for batch in pipeline:
+            batch = drop_existing_users(session, batch)[:count - added]
+            session.add_all([
+                User(
+                    first_name=user_data.first_name,
+                    last_name=user_data.last_name,
+                    email=user_data.email,
+                    username=user_data.username,
+                    password=hashed_password
+                )
+                for user_data, hashed_password in batch
+            ])
+            session.flush()
+            session.expunge_all()  # Keep the identity map from growing with count
+            added += len(batch)
+            print(f"Added {added}/{count} users to the session.")
+            if added >= count:
+                break
+        pipeline.close()
+
         print("Committing the session...")
         session.commit()
-        print(f"Successfully added {count} users to the database.")
+        print(f"Successfully added {added} users to the database.")
     except IntegrityError as ie:
         session.rollback()
         print("Integrity Error:", ie)
@@ -146,6 +411,140 @@ def seed_users(count: int):
         session.rollback()
         print("An unexpected error occurred:", e)
     finally:
+        if executor is not None:
+            executor.shutdown()
+        session.close()
+        print("Session closed.")
+
+# Columns written by the bulk loader, in COPY order
+USER_COLUMNS = ['id', 'first_name', 'last_name', 'email', 'username', 'password', 'created_at', 'updated_at']
+
+def build_user_rows(users: List[UserData], hashed_passwords: List[str]) -> List[dict]:
+    """
+    Builds users-table rows for the bulk loader, filling the defaults the ORM
+    would otherwise apply.
+    """
+    now = datetime.utcnow()
+    return [
+        {
+            'id': uuid.uuid4(),
+            'first_name': user_data.first_name,
+            'last_name': user_data.last_name,
+            'email': user_data.email,
+            'username': user_data.username,
+            'password': hashed_password,
+            'created_at': now,
+            'updated_at': now,
+        }
+        for user_data, hashed_password in zip(users, hashed_passwords)
+    ]
+
+def copy_user_rows(session, rows: List[dict]) -> int:
+    """
+    Writes rows with PostgreSQL COPY ... FROM STDIN through the session's
+    psycopg2 connection, inside the session's transaction. COPY cannot skip
+    conflicts, so rows are copied into a temporary staging table and moved
+    with INSERT ... ON CONFLICT DO NOTHING. Returns the number inserted.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row[column] for column in USER_COLUMNS])
+    buffer.seek(0)
+
+    columns = ', '.join(USER_COLUMNS)
+    staging = f"{User.__tablename__}_staging"
+    session.execute(text(
+        f"CREATE TEMP TABLE IF NOT EXISTS {staging} "
+        f"(LIKE {User.__tablename__} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    ))
+    dbapi_connection = session.connection().connection.driver_connection
+    with dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    result = session.execute(text(
+        f"INSERT INTO {User.__tablename__} ({columns}) SELECT {columns} FROM {staging} "
+        f"ON CONFLICT DO NOTHING"
+    ))
+    session.execute(text(f"TRUNCATE {staging}"))
+    return result.rowcount
+
+def insert_user_rows(session, rows: List[dict], use_copy: bool = True) -> int:
+    """
+    Inserts a chunk of rows, skipping rows that violate the unique email or
+    username constraints, and returns the number actually inserted. Uses COPY
+    on PostgreSQL and otherwise a single executemany INSERT ... ON CONFLICT DO
+    NOTHING (batched into multi-row VALUES by SQLAlchemy's insertmanyvalues).
+    Other dialects get a plain executemany INSERT, counted by its rowcount
+    since not all of them support RETURNING.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == 'postgresql' and use_copy:
+        return copy_user_rows(session, rows)
+    if dialect == 'postgresql':
+        statement = postgresql.insert(User.__table__).on_conflict_do_nothing()
+    elif dialect == 'sqlite':
+        statement = sqlite.insert(User.__table__).on_conflict_do_nothing()
+    else:
+        # MySQL and MariaDB skip conflicting rows with INSERT IGNORE; on other
+        # dialects a conflict raises IntegrityError and ends the run
+        statement = (
+            insert(User.__table__)
+            .prefix_with('IGNORE', dialect='mysql')
+            .prefix_with('IGNORE', dialect='mariadb')
+        )
+        return session.execute(statement, rows).rowcount
+    result = session.execute(statement.returning(User.__table__.c.id), rows)
+    return len(result.all())
+
+def seed_users_bulk(count: int, workers: int = 1, chunk_size: int = 1000, bloom: bool = False):
+    """
+    Seeds the users table in chunks of `chunk_size` fed by the pipeline: each
+    chunk is bulk-inserted and committed while the next one is generated and
+    hashed, so memory stays bounded by the chunk and queue sizes. Rows that
+    hit the unique constraints are skipped by the database and replaced by
+    freshly generated users.
+    """
+    if count <= 0:
+        print("No users to add.")
+        return
+    session = Session()
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    inserted = 0
+    start = time.perf_counter()
+    try:
+        seen = load_bloom_filter(session, count + pipeline_lookahead(chunk_size)) if bloom else None
+        pipeline = user_pipeline(chunk_size, workers, executor, seen)
+        for batch in pipeline:
+            batch = batch[:count - inserted]
+            if not batch:
+                continue
+            users, hashed_passwords = zip(*batch)
+            added = insert_user_rows(session, build_user_rows(users, hashed_passwords))
+            session.commit()
+
+            inserted += added
+            if added < len(users):
+                print(f"Skipped {len(users) - added} duplicate users; generating replacements.")
+            elapsed = time.perf_counter() - start
+            print(f"Inserted {inserted}/{count} users ({inserted / elapsed:.0f} rows/sec).")
+            if inserted >= count:
+                break
+        pipeline.close()
+
+        elapsed = time.perf_counter() - start
+        print(f"Successfully added {inserted} users in {elapsed:.1f}s ({inserted / elapsed:.0f} rows/sec).")
+    except IntegrityError as ie:
+        session.rollback()
+        print("Integrity Error:", ie)
+    except ValidationError as ve:
+        session.rollback()
+        print("Validation Error:", ve)
+    except Exception as e:
+        session.rollback()
+        print("An unexpected error occurred:", e)
+    finally:
+        if executor is not None:
+            executor.shutdown()
         session.close()
         print("Session closed.")
 
@@ -156,11 +555,32 @@ def parse_arguments():
     parser = argparse.ArgumentParser(description='Seed the users table with fake data.')
     parser.add_argument('-n', '--number', type=int, default=10,
                         help='Number of fake users to generate (default: 10)')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='Processes used to hash passwords (default: 1)')
+    parser.add_argument('-m', '--mode', choices=['orm', 'bulk'], default='orm',
+                        help='orm adds all users in one session; bulk streams chunks via COPY (default: orm)')
+    parser.add_argument('-c', '--chunk-size', type=int, default=1000,
+                        help='Users per insert/hash chunk (default: 1000)')
+    parser.add_argument('--bloom', action='store_true',
+                        help='Pre-check emails/usernames against a Bloom filter of existing users')
+    parser.add_argument('--sql-log', choices=SQL_LOG_MODES, default='off',
+                        help=f'Write SQL statements to {LOG_FILE}: off, every Nth (sampled) or all (full) '
+                             '(default: off)')
+    parser.add_argument('--sql-log-every', type=int, default=100,
+                        help='Statements per logged statement in sampled mode (default: 100)')
     return parser.parse_args()
 
 def main():
     args = parse_arguments()
-    seed_users(args.number)
+    listener = configure_sql_logging(args.sql_log, args.sql_log_every)
+    try:
+        if args.mode == 'bulk':
+            seed_users_bulk(args.number, workers=args.workers, chunk_size=args.chunk_size, bloom=args.bloom)
+        else:
+            seed_users(args.number, workers=args.workers, chunk_size=args.chunk_size, bloom=args.bloom)
+    finally:
+        if listener is not None:
+            listener.stop()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file